@@ -19,8 +19,10 @@
 
 import random
 
+import numpy as np
+
 from OCC.Core.Bnd import Bnd_Box
-from OCC.Core.BRepBndLib import brepbndlib_Add
+from OCC.Core.BRepBndLib import brepbndlib_Add, brepbndlib_AddOptimal
 from OCC.Core.TColgp import (
     TColgp_HArray1OfPnt,
     TColgp_Array1OfPnt,
@@ -51,10 +53,14 @@ from OCC.Core.BRepGProp import (
     brepgprop_VolumeProperties,
 )
 from OCC.Core.GeomAdaptor import GeomAdaptor_Curve
+from OCC.Core.TopExp import topexp_MapShapes
+from OCC.Core.TopTools import TopTools_IndexedMapOfShape
 from OCC.Core.Geom import Geom_Curve
 
 from OCC.Core import Graphic3d
 
+from OCCUtils.Conversion import bspline_to_numpy, from_numpy
+
 # ===========================================================================
 # No PythonOCC dependencies...
 # ===========================================================================
@@ -93,19 +99,131 @@ def roundlist(li, n_decimals=3):
 TOLERANCE = 1e-6
 
 
-def get_boundingbox(shape, tol=TOLERANCE):
+def _subshape_map(shape, topologyType):
+    """returns the map of the unique topologyType sub-shapes of *shape*"""
+    _map = TopTools_IndexedMapOfShape()
+    topexp_MapShapes(shape, topologyType, _map)
+    return _map
+
+
+def _unique_subshapes(shape, topologyType):
+    """
+    returns the unique topologyType sub-shapes of *shape*, in the order
+    Topo(shape).faces(), Topo(shape).edges() ... return them, uncast
+    """
+    _map = _subshape_map(shape, topologyType)
+    return [_map.FindKey(i) for i in range(1, _map.Extent() + 1)]
+
+
+def _compute_boundingbox(shape, tol, optimal, use_triangulation):
+    bbox = Bnd_Box()
+    bbox.SetGap(tol)
+    if optimal:
+        brepbndlib_AddOptimal(shape, bbox, use_triangulation, False)
+    else:
+        brepbndlib_Add(shape, bbox, use_triangulation)
+    return bbox.Get()
+
+
+class _ShapeCache(object):
+    """
+    values computed once per TShape + Location, kept apart per key
+
+    a shape and its reversed copy share their values, while a moved copy
+    of a shape gets its own
+    """
+
+    def __init__(self):
+        # key -> ( shapes, values ), the value of the shape with index i in
+        # shapes is values[i - 1]
+        self._values = {}
+
+    def __len__(self):
+        return sum(len(values) for _, values in self._values.values())
+
+    def clear(self):
+        self._values.clear()
+
+    def _get(self, key, shape, compute):
+        if key not in self._values:
+            self._values[key] = (TopTools_IndexedMapOfShape(), [])
+        shapes, values = self._values[key]
+        index = shapes.FindIndex(shape)
+        if index == 0:
+            values.append(compute(shape))
+            index = shapes.Add(shape)
+        return values[index - 1]
+
+
+class BoundingBoxCache(_ShapeCache):
+    """
+    bounding boxes of shapes, computed once per TShape + Location
+
+    a shape and its reversed copy share their box, while a moved copy of a
+    shape gets its own; boxes computed with different settings are kept
+    apart
+
+    >>> cache = BoundingBoxCache()
+    >>> boxes = get_boundingboxes(shape, TopAbs_FACE, cache=cache)
+    """
+
+    def get(self, shape, tol=TOLERANCE, optimal=False, use_triangulation=True):
+        """returns the xmin, ymin, zmin, xmax, ymax, zmax box of *shape*"""
+        return self._get(
+            (tol, optimal, use_triangulation),
+            shape,
+            lambda shp: _compute_boundingbox(shp, tol, optimal, use_triangulation),
+        )
+
+
+def get_boundingbox(
+    shape, tol=TOLERANCE, optimal=False, use_triangulation=True, cache=None
+):
     """
     :param shape: TopoDS_Shape such as TopoDS_Face
     :param tol: tolerance
+    :param optimal: compute the tight box of the geometry, rather than the
+    box of its control points, slower
+    :param use_triangulation: use the triangulation of the shape, when it
+    has one
+    :param cache: a BoundingBoxCache to reuse the boxes computed before
     :return: xmin, ymin, zmin, xmax, ymax, zmax
     """
-    bbox = Bnd_Box()
-    bbox.SetGap(tol)
-    brepbndlib_Add(shape, bbox)
-    xmin, ymin, zmin, xmax, ymax, zmax = bbox.Get()
+    if cache is not None:
+        return cache.get(shape, tol, optimal, use_triangulation)
+    xmin, ymin, zmin, xmax, ymax, zmax = _compute_boundingbox(
+        shape, tol, optimal, use_triangulation
+    )
     return xmin, ymin, zmin, xmax, ymax, zmax
 
 
+def get_boundingboxes(
+    shapes,
+    topologyType=None,
+    tol=TOLERANCE,
+    optimal=False,
+    use_triangulation=True,
+    cache=None,
+):
+    """
+    returns the bounding boxes of many shapes at once
+
+    :param shapes: a sequence of TopoDS_*, or a single TopoDS_* along with
+    topologyType
+    :param topologyType: TopAbs_FACE, TopAbs_SOLID ...; the boxes of all
+    the sub-shapes of that type of *shapes* are returned, in the order
+    Topo(shapes).faces(), Topo(shapes).solids() ... return them
+    :param cache: a BoundingBoxCache, see get_boundingbox for the others
+    :return: a ( N, 6 ) float64 array of xmin, ymin, zmin, xmax, ymax, zmax
+    """
+    if topologyType is not None:
+        shapes = _unique_subshapes(shapes, topologyType)
+    boxes = np.empty((len(shapes), 6), dtype=np.float64)
+    for i, shape in enumerate(shapes):
+        boxes[i] = get_boundingbox(shape, tol, optimal, use_triangulation, cache)
+    return boxes
+
+
 def smooth_pnts(pnts):
     smooth = [pnts[0]]
     for i in range(1, len(pnts) - 1):
@@ -134,30 +252,20 @@ def to_string(_string):
 
 
 def to_tcol_(_list, collection_type):
-    array = collection_type(1, len(_list) + 1)
-    for n, i in enumerate(_list):
-        array.SetValue(n + 1, i)
-    return array
+    return from_numpy(_list, collection_type)
 
 
 def _Tcol_dim_1(li, _type):
     """function factory for 1-dimensional TCol* types"""
-    pts = _type(0, len(li) - 1)
-    for n, i in enumerate(li):
-        pts.SetValue(n, i)
-    pts.thisown = False
-    return pts
+    return from_numpy(li, _type)
 
 
 def point_list_to_TColgp_Array1OfPnt(li):
-    pts = TColgp_Array1OfPnt(0, len(li) - 1)
-    for n, i in enumerate(li):
-        pts.SetValue(n, i)
-    return pts
+    return from_numpy(li, TColgp_Array1OfPnt)
 
 
 def point2d_list_to_TColgp_Array1OfPnt2d(li):
-    return _Tcol_dim_1(li, TColgp_Array1OfPnt2d)
+    return from_numpy(li, TColgp_Array1OfPnt2d)
 
 
 # ===========================================================================
@@ -169,14 +277,98 @@ def filter_points_by_distance(list_of_point, distance=0.1):
     """
     get rid of those point that lie within tolerance of a
     consequtive series of points
+
+    the points are walked in order, a point is kept unless it lies within
+    *distance* of a point kept before it; the kept points are hashed on a
+    grid of cells of that size, so that a point is only compared to the
+    points of the cells around it
+
+    :param list_of_point: a list of gp_Pnt, or a ( N, 3 ) array
+    :return: the kept gp_Pnt, or the kept rows of the array
     """
-    tmp = [list_of_point[0]]
-    for a in list_of_point[1:]:
-        if any([a.IsEqual(i, distance) for i in tmp]):
-            continue
-        else:
-            tmp.append(a)
-    return tmp
+    if len(list_of_point) == 0:
+        return list_of_point[:0]
+    points = _as_points_array(list_of_point)
+    if distance < 0:
+        # as gp_Pnt.IsEqual, no point lies within a negative distance
+        kept = list(range(len(points)))
+    else:
+        kept = _kept_by_distance(points, distance)
+    if isinstance(list_of_point, np.ndarray):
+        return list_of_point[kept]
+    return [list_of_point[i] for i in kept]
+
+
+def _kept_by_distance(points, distance):
+    """
+    returns the sorted indices of the ( N, 3 ) *points* that
+    filter_points_by_distance keeps, distance >= 0
+    """
+    # cells at least *distance* wide: the points within distance of a point
+    # lie in the 27 cells around its own
+    size = distance if distance > 0 else 1.0
+    cells = np.floor(points / size)
+    cells -= cells.min(axis=0) - 1
+    nx, ny, nz = (cells.max(axis=0) + 2).tolist()
+    # a cell is numbered ( cx * ny + cy ) * nz + cz
+    ny, nz = int(ny), int(nz)
+    # own cell first, it is the most likely to hold a close point
+    offsets = [0] + [
+        (i * ny + j) * nz + k
+        for i in (-1, 0, 1)
+        for j in (-1, 0, 1)
+        for k in (-1, 0, 1)
+        if (i, j, k) != (0, 0, 0)
+    ]
+
+    if nx * ny * nz < 2.0 ** 62:
+        cells = cells.astype(np.int64)
+        keys = (cells[:, 0] * ny + cells[:, 1]) * nz + cells[:, 2]
+        # the points alone in the cells around them are kept, and are too
+        # far from the others to be compared with them
+        cell_keys, cell_of_point, cell_counts = np.unique(
+            keys, return_inverse=True, return_counts=True
+        )
+        n_around = np.zeros(len(cell_keys), dtype=np.int64)
+        for offset in offsets:
+            # searching sorted keys is much faster than searching the raw ones
+            position = np.searchsorted(cell_keys, cell_keys + offset)
+            position = np.minimum(position, len(cell_keys) - 1)
+            found = cell_keys[position] == cell_keys + offset
+            n_around += np.where(found, cell_counts[position], 0)
+        alone = (n_around == 1)[cell_of_point.reshape(-1)]
+        kept = np.flatnonzero(alone).tolist()
+        crowded = np.flatnonzero(~alone)
+        crowded_keys = keys[crowded].tolist()
+    else:
+        # the cell numbers would overflow int64, they are computed as python
+        # integers, and every point is compared to the points around it
+        kept = []
+        crowded = np.arange(len(points))
+        crowded_keys = [
+            (int(cx) * ny + int(cy)) * nz + int(cz) for cx, cy, cz in cells.tolist()
+        ]
+
+    squared = distance * distance
+    grid = {}
+    crowded_points = zip(crowded.tolist(), crowded_keys, points[crowded].tolist())
+    for index, key, (x, y, z) in crowded_points:
+        duplicate = False
+        for offset in offsets:
+            cell = grid.get(key + offset)
+            if cell is None:
+                continue
+            for ox, oy, oz in cell:
+                if (x - ox) ** 2 + (y - oy) ** 2 + (z - oz) ** 2 <= squared:
+                    duplicate = True
+                    break
+            if duplicate:
+                break
+        if not duplicate:
+            grid.setdefault(key, []).append((x, y, z))
+            kept.append(index)
+    kept.sort()
+    return kept
 
 
 def points_to_bspline(pnts):
@@ -192,22 +384,14 @@ def interpolate_points_to_spline(
     list_of_points, start_tangent, end_tangent, filter_pts=True, tolerance=TOLERANCE
 ):
     """
-    GeomAPI_Interpolate is buggy: need to use `fix` in order
-    to get the right points in...
+    interpolates a curve through *list_of_points*, a list of gp_Pnt or a
+    ( N, 3 ) array, tangent to start_tangent and end_tangent
     """
 
-    def fix(li, _type):
-        """function factory for 1-dimensional TCol* types"""
-        pts = _type(1, len(li))
-        for n, i in enumerate(li):
-            pts.SetValue(n + 1, i)
-        pts.thisown = False
-        return pts
-
     if filter_pts:
         list_of_points = filter_points_by_distance(list_of_points, 0.1)
 
-    fixed_points = fix(list_of_points, TColgp_HArray1OfPnt)
+    fixed_points = from_numpy(list_of_points, TColgp_HArray1OfPnt)
     try:
         interp = GeomAPI_Interpolate(fixed_points, False, tolerance)
         interp.Load(start_tangent, end_tangent, False)
@@ -225,20 +409,10 @@ def interpolate_points_vectors_to_spline(
     build a curve from a set of points and vectors
     the vectors describe the tangent vector at the corresponding point
     """
-    # GeomAPI_Interpolate is buggy: need to use `fix` in order to
-    # get the right points in...
     assert len(list_of_points) == len(
         list_of_vectors
     ), "vector and point list not of same length"
 
-    def fix(li, _type):
-        """function factory for 1-dimensional TCol* types"""
-        pts = _type(1, len(li))
-        for n, i in enumerate(li):
-            pts.SetValue(n + 1, i)
-        pts.thisown = False
-        return pts
-
     if vector_mask is not None:
         assert len(vector_mask) == len(
             list_of_points
@@ -246,9 +420,9 @@ def interpolate_points_vectors_to_spline(
     else:
         vector_mask = [True for i in range(len(list_of_points))]
 
-    fixed_mask = fix(vector_mask, TColStd_HArray1OfBoolean)
-    fixed_points = fix(list_of_points, TColgp_HArray1OfPnt)
-    fixed_vectors = fix(list_of_vectors, TColgp_Array1OfVec)
+    fixed_mask = from_numpy(vector_mask, TColStd_HArray1OfBoolean)
+    fixed_points = from_numpy(list_of_points, TColgp_HArray1OfPnt)
+    fixed_vectors = from_numpy(list_of_vectors, TColgp_Array1OfVec)
 
     try:
         interp = GeomAPI_Interpolate(fixed_points, False, tolerance)
@@ -265,22 +439,14 @@ def interpolate_points_to_spline_no_tangency(
     list_of_points, filter_pts=True, closed=False, tolerance=TOLERANCE
 ):
     """
-    GeomAPI_Interpolate is buggy: need to use `fix`
-    in order to get the right points in...
+    interpolates a curve through *list_of_points*, a list of gp_Pnt or a
+    ( N, 3 ) array
     """
 
-    def fix(li, _type):
-        """function factory for 1-dimensional TCol* types"""
-        pts = _type(1, len(li))
-        for n, i in enumerate(li):
-            pts.SetValue(n + 1, i)
-        pts.thisown = False
-        return pts
-
     if filter_pts:
         list_of_points = filter_points_by_distance(list_of_points, 0.1)
 
-    fixed_points = fix(list_of_points, TColgp_HArray1OfPnt)
+    fixed_points = from_numpy(list_of_points, TColgp_HArray1OfPnt)
     try:
         interp = GeomAPI_Interpolate(fixed_points, closed, tolerance)
         interp.Perform()
@@ -292,6 +458,136 @@ def interpolate_points_to_spline_no_tangency(
         raise RuntimeError("FAILED TO INTERPOLATE THE POINTS")
 
 
+class CurveFit(object):
+    """
+    the outcome of fitting one curve in interpolate_curves
+
+    index: position of the points in the list given to interpolate_curves
+    curve: the Geom_BSplineCurve, None when it failed or as_arrays is set
+    arrays: the bspline_to_numpy dict of the curve, when as_arrays is set
+    error: why the fit failed, None when it succeeded
+    """
+
+    def __init__(self, index, curve=None, arrays=None, error=None):
+        self.index = index
+        self.curve = curve
+        self.arrays = arrays
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        if self.ok:
+            return "<CurveFit %i>" % self.index
+        return "<CurveFit %i failed: %s>" % (self.index, self.error)
+
+
+def _fit_bspline(points, tangents, approximate, closed, tolerance):
+    """
+    returns the Geom_BSplineCurve through *points*, raises RuntimeError
+    when it cannot be built
+
+    :param tangents: ( N, 3 ) tangents at the points, rows of nan leave
+    the tangent at that point free; or None
+    """
+    if approximate:
+        fit = GeomAPI_PointsToBSpline(from_numpy(points, TColgp_Array1OfPnt))
+        if not fit.IsDone():
+            raise RuntimeError("GeomAPI_PointsToBSpline failed")
+        return fit.Curve()
+    interp = GeomAPI_Interpolate(
+        from_numpy(points, TColgp_HArray1OfPnt), closed, tolerance
+    )
+    if tangents is not None:
+        tangents = np.asarray(tangents, dtype=np.float64).reshape(-1, 3)
+        mask = ~np.isnan(tangents).any(axis=1)
+        if mask.any():
+            interp.Load(
+                from_numpy(np.where(mask[:, None], tangents, 0.0), TColgp_Array1OfVec),
+                from_numpy(mask, TColStd_HArray1OfBoolean),
+                False,
+            )
+    interp.Perform()
+    if not interp.IsDone():
+        raise RuntimeError("GeomAPI_Interpolate failed")
+    return interp.Curve()
+
+
+def _fit_bsplines(
+    start, point_arrays, tangents, approximate, closed, tolerance, as_arrays
+):
+    """
+    returns a CurveFit per array of points, numbered from *start*; a
+    failure is reported in its CurveFit rather than raised
+    """
+    fits = []
+    for i, points in enumerate(point_arrays):
+        try:
+            curve = _fit_bspline(
+                points,
+                tangents[i] if tangents is not None else None,
+                approximate,
+                closed,
+                tolerance,
+            )
+        except Exception as error:
+            fits.append(CurveFit(start + i, error=str(error) or type(error).__name__))
+            continue
+        if as_arrays:
+            fits.append(CurveFit(start + i, arrays=bspline_to_numpy(curve)))
+        else:
+            fits.append(CurveFit(start + i, curve=curve))
+    return fits
+
+
+def interpolate_curves(
+    point_arrays,
+    tangents=None,
+    approximate=False,
+    closed=False,
+    tolerance=TOLERANCE,
+    as_arrays=False,
+    parallel=False,
+    processes=None,
+    chunksize=None,
+):
+    """
+    fits a b-spline curve through each array of points
+
+    :param point_arrays: a list of ( N, 3 ) arrays, or of lists of gp_Pnt
+    :param tangents: None, or a list with, for each array of points, None
+    or the ( N, 3 ) tangents at the points, rows of nan leave the tangent
+    at that point free
+    :param approximate: approximate the points with GeomAPI_PointsToBSpline,
+    rather than interpolating them with GeomAPI_Interpolate; the tangents
+    and closed are then ignored
+    :param closed: interpolate periodic curves
+    :param as_arrays: return the curves as bspline_to_numpy dicts, rather
+    than Geom_BSplineCurve
+    :param parallel: fit the curves in worker processes, see
+    Parallel.interpolate_curves
+    :return: a list of CurveFit, in the order of point_arrays
+    """
+    if parallel:
+        from OCCUtils.Parallel import interpolate_curves as parallel_interpolate
+
+        return parallel_interpolate(
+            point_arrays,
+            tangents,
+            approximate,
+            closed,
+            tolerance,
+            as_arrays,
+            processes,
+            chunksize,
+        )
+    return _fit_bsplines(
+        0, point_arrays, tangents, approximate, closed, tolerance, as_arrays
+    )
+
+
 # ===========================================================================
 # --- RANDOMNESS ---
 # ===========================================================================
@@ -340,29 +636,31 @@ def midpoint(pntA, pntB):
     return gp_Pnt(veccie.XYZ())
 
 
-def center_boundingbox(shape):
+def center_boundingbox(shape, cache=None):
     """
     compute the center point of a TopoDS_Shape, based on its bounding box
     @param shape: TopoDS_* instance
+    @param cache: a BoundingBoxCache, see get_boundingbox
     returns a gp_Pnt instance
     """
-    xmin, ymin, zmin, xmax, ymax, zmax = get_boundingbox(shape, 1e-6)
+    xmin, ymin, zmin, xmax, ymax, zmax = get_boundingbox(shape, 1e-6, cache=cache)
     return midpoint(gp_Pnt(xmin, ymin, zmin), gp_Pnt(xmax, ymax, zmax))
 
 
-def point_in_boundingbox(solid, pnt, tolerance=1e-5):
+def point_in_boundingbox(solid, pnt, tolerance=1e-5, cache=None):
     """returns True if *pnt* lies in *boundingbox*, False if not
     this is a much speedier test than checking the TopoDS_Solid
     Args:
         solid   TopoDS_Solid
         pnt:    gp_Pnt
+        cache:  a BoundingBoxCache, see get_boundingbox
 
     Returns: bool
     """
-    bbox = Bnd_Box()
-    bbox.SetGap(tolerance)
-    brepbndlib_Add(solid, bbox)
-    return not bbox.IsOut(pnt)
+    xmin, ymin, zmin, xmax, ymax, zmax = get_boundingbox(solid, tolerance, cache=cache)
+    return (
+        xmin <= pnt.X() <= xmax and ymin <= pnt.Y() <= ymax and zmin <= pnt.Z() <= zmax
+    )
 
 
 def point_in_solid(solid, pnt, tolerance=1e-5):
@@ -377,7 +675,6 @@ def point_in_solid(solid, pnt, tolerance=1e-5):
     from OCC.Core.TopAbs import TopAbs_ON, TopAbs_OUT, TopAbs_IN
 
     _in_solid = BRepClass3d_SolidClassifier(solid, pnt, tolerance)
-    print("State", _in_solid.State())
     if _in_solid.State() == TopAbs_ON:
         return None, "on"
     if _in_solid.State() == TopAbs_OUT:
@@ -386,6 +683,74 @@ def point_in_solid(solid, pnt, tolerance=1e-5):
         return True, "in"
 
 
+class SolidClassifier(object):
+    """
+    classifies many points against a solid, which is loaded once
+
+    the points outside the bounding box of the solid are classified as
+    TopAbs_OUT at once, without running the classifier on them
+    """
+
+    def __init__(self, solid, tolerance=1e-5):
+        from OCC.Core.BRepClass3d import BRepClass3d_SolidClassifier
+
+        self.solid = solid
+        self.tolerance = tolerance
+        self._classifier = BRepClass3d_SolidClassifier(solid)
+        self._bbox = get_boundingbox(solid, tolerance)
+
+    def classify(self, points):
+        """
+        :param points: ( N, 3 ) array, or a list of gp_Pnt
+        :return: ( N, ) int8 array of TopAbs_IN, TopAbs_OUT or TopAbs_ON
+        """
+        from OCC.Core.TopAbs import TopAbs_OUT
+
+        points = _as_points_array(points)
+        states = np.full(len(points), TopAbs_OUT, dtype=np.int8)
+        xmin, ymin, zmin, xmax, ymax, zmax = self._bbox
+        inside = (
+            (points >= (xmin, ymin, zmin)) & (points <= (xmax, ymax, zmax))
+        ).all(axis=1)
+        for i in np.flatnonzero(inside):
+            x, y, z = points[i]
+            self._classifier.Perform(gp_Pnt(x, y, z), self.tolerance)
+            states[i] = self._classifier.State()
+        return states
+
+
+def _as_points_array(points):
+    """
+    returns a ( N, 3 ) float64 array from an array, a list of gp_Pnt or a
+    single gp_Pnt; gp_Dir and gp_Vec are accepted as well
+    """
+    if hasattr(points, "XYZ"):
+        points = [points]
+    if len(points) and hasattr(points[0], "XYZ"):
+        points = [pnt.Coord() for pnt in points]
+    return np.asarray(points, dtype=np.float64).reshape(-1, 3)
+
+
+def classify_points(
+    solid, points, tolerance=1e-5, parallel=False, processes=None, chunksize=None
+):
+    """
+    classifies points against a solid
+
+    :param solid: TopoDS_Solid
+    :param points: ( N, 3 ) array, or a list of gp_Pnt
+    :param tolerance: distance within which a point is on the solid
+    :param parallel: split the points over worker processes, see
+    Parallel.classify_points
+    :return: ( N, ) int8 array of TopAbs_IN, TopAbs_OUT or TopAbs_ON
+    """
+    if parallel:
+        from OCCUtils.Parallel import classify_points as parallel_classify_points
+
+        return parallel_classify_points(solid, points, tolerance, processes, chunksize)
+    return SolidClassifier(solid, tolerance).classify(points)
+
+
 def intersection_from_three_planes(planeA, planeB, planeC):
     """
     intersection from 3 planes
@@ -440,6 +805,106 @@ def intersect_shape_by_line(
         )
 
 
+# fields of the hits RayCaster returns, "ray" is the index of the ray that
+# hit "face", the index of the face in Topo(shape).faces(), at "point"; u, v
+# are the parameters of the point on the face, w on the ray
+RAY_HIT_DTYPE = [
+    ("ray", "i8"),
+    ("point", "f8", (3,)),
+    ("face", "i8"),
+    ("u", "f8"),
+    ("v", "f8"),
+    ("w", "f8"),
+]
+
+
+class RayCaster(object):
+    """
+    intersects many rays with a shape, which is loaded once
+    """
+
+    def __init__(self, shape, tolerance=TOLERANCE):
+        from OCC.Core.IntCurvesFace import IntCurvesFace_ShapeIntersector
+        from OCC.Core.TopAbs import TopAbs_FACE
+
+        self.shape = shape
+        self.tolerance = tolerance
+        self._intersector = IntCurvesFace_ShapeIntersector()
+        self._intersector.Load(shape, tolerance)
+        self._faces = _subshape_map(shape, TopAbs_FACE)
+
+    def cast(
+        self,
+        origins,
+        directions,
+        nearest=True,
+        low_parameter=0.0,
+        hi_parameter=float("+inf"),
+    ):
+        """
+        :param origins: ( N, 3 ) array, or a list of gp_Pnt
+        :param directions: ( N, 3 ) array, or a list of gp_Dir, or a single
+        direction shared by all rays
+        :param nearest: return the nearest hit of each ray only, rather than
+        all its hits
+        :param low_parameter: start of the rays, along their directions
+        :param hi_parameter: end of the rays, along their directions
+        :return: a RAY_HIT_DTYPE array of the hits, ordered by ray and along
+        each ray; the rays that hit nothing have no entry
+        """
+        from OCC.Core.gp import gp_Dir, gp_Lin
+
+        origins = _as_points_array(origins)
+        directions = np.broadcast_to(_as_points_array(directions), origins.shape)
+        intersector = self._intersector
+        hits = []
+        for i, ((x, y, z), (dx, dy, dz)) in enumerate(zip(origins, directions)):
+            line = gp_Lin(gp_Pnt(x, y, z), gp_Dir(dx, dy, dz))
+            if nearest:
+                intersector.PerformNearest(line, low_parameter, hi_parameter)
+            else:
+                intersector.Perform(line, low_parameter, hi_parameter)
+            if not intersector.IsDone():
+                continue
+            for j in range(1, intersector.NbPnt() + 1):
+                hits.append(
+                    (
+                        i,
+                        intersector.Pnt(j).Coord(),
+                        self._faces.FindIndex(intersector.Face(j)) - 1,
+                        intersector.UParameter(j),
+                        intersector.VParameter(j),
+                        intersector.WParameter(j),
+                    )
+                )
+        return np.array(hits, dtype=RAY_HIT_DTYPE)
+
+
+def cast_rays(
+    shape,
+    origins,
+    directions,
+    nearest=True,
+    tolerance=TOLERANCE,
+    parallel=False,
+    processes=None,
+    chunksize=None,
+):
+    """
+    intersects rays with a shape, see RayCaster.cast
+
+    :param parallel: split the rays over worker processes, see
+    Parallel.cast_rays
+    """
+    if parallel:
+        from OCCUtils.Parallel import cast_rays as parallel_cast_rays
+
+        return parallel_cast_rays(
+            shape, origins, directions, nearest, tolerance, processes, chunksize
+        )
+    return RayCaster(shape, tolerance).cast(origins, directions, nearest)
+
+
 def normal_vector_from_plane(plane, vec_length=1.0):
     """
     returns a vector normal to the plane of length vec_length
@@ -505,28 +970,171 @@ def resample_curve_with_uniform_deflection(
 # ===========================================================================
 
 
+class MassProperties(object):
+    """
+    the mass properties of a shape, read from a single integration
+
+    mass: the volume, area or length of the shape
+    centre: the ( x, y, z ) centre of mass
+    inertia: the 3 x 3 matrix of inertia at the centre of mass, as tuples
+    moments: the principal moments of inertia
+    gprops: the GProp_GProps they were read from, shared with the cache:
+    treat it as read only, or modify a copy_gprops() copy
+    location: the gp_Pnt gprops is built at, the origin of the shape's
+    location as brepgprop sets it
+    """
+
+    def __init__(self, gprops, location=None):
+        self.gprops = gprops
+        self.location = location if location is not None else gp_Pnt()
+        self.mass = gprops.Mass()
+        self.centre = gprops.CentreOfMass().Coord()
+        matrix = gprops.MatrixOfInertia()
+        self.inertia = tuple(
+            tuple(matrix.Value(i, j) for j in (1, 2, 3)) for i in (1, 2, 3)
+        )
+        self.moments = tuple(gprops.PrincipalProperties().Moments())
+
+    def copy_gprops(self):
+        """returns a copy of gprops, that can be modified ( Add ... )"""
+        # a system at the same location, which adding copies as is, without
+        # transferring the inertia from one location to the other
+        gprops = GProp_GProps(self.location)
+        gprops.Add(self.gprops)
+        return gprops
+
+
+def _mass_kind(shape):
+    """returns the kind of mass properties of a shape, "volume" for solids"""
+    from OCC.Core.TopAbs import TopAbs_FACE, TopAbs_SHELL, TopAbs_EDGE, TopAbs_WIRE
+
+    shape_type = shape.ShapeType()
+    if shape_type in (TopAbs_FACE, TopAbs_SHELL):
+        return "surface"
+    if shape_type in (TopAbs_EDGE, TopAbs_WIRE):
+        return "linear"
+    return "volume"
+
+
+def _integrate(shape, kind, tolerance):
+    prop = GProp_GProps()
+    if kind == "volume":
+        if tolerance is None:
+            brepgprop_VolumeProperties(shape, prop)
+        else:
+            brepgprop_VolumeProperties(shape, prop, tolerance)
+    elif kind == "surface":
+        if tolerance is None:
+            brepgprop_SurfaceProperties(shape, prop)
+        else:
+            brepgprop_SurfaceProperties(shape, prop, tolerance)
+    elif kind == "linear":
+        brepgprop_LinearProperties(shape, prop)
+    else:
+        raise ValueError("no %s mass properties" % kind)
+    # brepgprop builds its system at the origin of the shape's location
+    location = gp_Pnt().Transformed(shape.Location().Transformation())
+    return MassProperties(prop, location)
+
+
+class MassPropertiesCache(_ShapeCache):
+    """
+    mass properties of shapes, integrated once per TShape + Location +
+    Orientation, kind and tolerance
+    """
+
+    def get(self, shape, kind=None, tolerance=1e-5):
+        """returns the MassProperties of *shape*, see mass_properties"""
+        kind = kind or _mass_kind(shape)
+        if kind == "linear":
+            # the linear properties take no tolerance
+            tolerance = None
+        # the volume of a reversed solid is negative
+        return self._get(
+            (kind, tolerance, shape.Orientation()),
+            shape,
+            lambda shp: _integrate(shp, kind, tolerance),
+        )
+
+
+def mass_properties(shape, kind=None, tolerance=1e-5, cache=None):
+    """
+    returns the MassProperties of *shape*
+
+    :param kind: "volume", "surface" or "linear"; by default "surface" for
+    faces and shells, "linear" for edges and wires, "volume" otherwise
+    :param tolerance: relative precision of the adaptive integration of the
+    volume and surface properties, None for the plain integration
+    :param cache: a MassPropertiesCache to reuse the properties computed
+    before
+    """
+    if cache is None:
+        return _integrate(shape, kind or _mass_kind(shape), tolerance)
+    return cache.get(shape, kind, tolerance)
+
+
+def get_mass_properties(
+    shapes, topologyType=None, kind=None, tolerance=1e-5, cache=None
+):
+    """
+    returns the mass properties of many shapes at once, such as all the
+    solids of an assembly
+
+    :param shapes: a sequence of TopoDS_*, or a single TopoDS_* along with
+    topologyType
+    :param topologyType: TopAbs_FACE, TopAbs_SOLID ...; the properties of
+    all the sub-shapes of that type of *shapes* are returned, in the order
+    Topo(shapes).faces(), Topo(shapes).solids() ... return them
+    :return: a dict of numpy arrays, "mass" ( N, ), "centre" ( N, 3 ),
+    "inertia" ( N, 3, 3 ) and "moments" ( N, 3 ); see mass_properties for
+    the other parameters
+    """
+    if topologyType is not None:
+        shapes = _unique_subshapes(shapes, topologyType)
+    arrays = {
+        "mass": np.empty(len(shapes)),
+        "centre": np.empty((len(shapes), 3)),
+        "inertia": np.empty((len(shapes), 3, 3)),
+        "moments": np.empty((len(shapes), 3)),
+    }
+    for i, shape in enumerate(shapes):
+        props = mass_properties(shape, kind, tolerance, cache)
+        arrays["mass"][i] = props.mass
+        arrays["centre"][i] = props.centre
+        arrays["inertia"][i] = props.inertia
+        arrays["moments"][i] = props.moments
+    return arrays
+
+
 class GpropsFromShape(object):
+    """
+    the volume, surface and linear properties of a shape, each integrated
+    once the first time it is asked for
+
+    volume(), surface() and linear() return a new GProp_GProps at each
+    call, that the caller can modify
+    """
+
     def __init__(self, shape, tolerance=1e-5):
         self.shape = shape
         self.tolerance = tolerance
+        self._cache = MassPropertiesCache()
+
+    def properties(self, kind=None):
+        """returns the MassProperties of the shape, see mass_properties"""
+        return self._cache.get(self.shape, kind, self.tolerance)
 
     def volume(self):
         """returns the volume of a solid"""
-        prop = GProp_GProps()
-        brepgprop_VolumeProperties(self.shape, prop, self.tolerance)
-        return prop
+        return self.properties("volume").copy_gprops()
 
     def surface(self):
         """returns the area of a surface"""
-        prop = GProp_GProps()
-        brepgprop_SurfaceProperties(self.shape, prop, self.tolerance)
-        return prop
+        return self.properties("surface").copy_gprops()
 
     def linear(self):
         """returns the length of a wire or edge"""
-        prop = GProp_GProps()
-        brepgprop_LinearProperties(self.shape, prop)
-        return prop
+        return self.properties("linear").copy_gprops()
 
 
 def curve_length(crv):
@@ -555,7 +1163,10 @@ def minimum_distance(shp1, shp2):
     """
     from OCC.Core.BRepExtrema import BRepExtrema_DistShapeShape
 
-    bdss = BRepExtrema_DistShapeShape(shp1, shp2)
+    # the constructor taking the shapes computes the distance already
+    bdss = BRepExtrema_DistShapeShape()
+    bdss.LoadS1(shp1)
+    bdss.LoadS2(shp2)
     bdss.Perform()
     with assert_isdone(bdss, "failed computing minimum distances"):
         min_dist = bdss.Value()
@@ -566,6 +1177,98 @@ def minimum_distance(shp1, shp2):
     return min_dist, min_dist_shp1, min_dist_shp2
 
 
+# fields of the distances minimum_distances returns, the distance between
+# the shapes with indices "i" < "j", and their closest points
+DISTANCE_DTYPE = [
+    ("i", "i8"),
+    ("j", "i8"),
+    ("distance", "f8"),
+    ("point_i", "f8", (3,)),
+    ("point_j", "f8", (3,)),
+]
+
+
+def _candidate_pairs(boxes, cutoff):
+    """
+    returns the ( M, 2 ) pairs i < j of the ( N, 6 ) boxes that are no
+    farther apart than *cutoff*
+    """
+    from OCCUtils.SpatialIndex import BoundingVolumeHierarchy
+
+    index = BoundingVolumeHierarchy(boxes)
+    margin = np.array([-cutoff] * 3 + [cutoff] * 3)
+    pairs = [np.zeros((0, 2), dtype=np.int64)]
+    for i, box in enumerate(boxes):
+        others = index.query_box(box + margin)
+        others = others[others > i]
+        pairs.append(np.column_stack([np.full(len(others), i), others]))
+    pairs = np.concatenate(pairs)
+    # the boxes overlap on each axis within cutoff, drop the ones whose
+    # corners are farther apart than that
+    a, b = boxes[pairs[:, 0]], boxes[pairs[:, 1]]
+    gaps = np.maximum(np.maximum(a[:, :3] - b[:, 3:], b[:, :3] - a[:, 3:]), 0.0)
+    return pairs[np.sqrt((gaps ** 2).sum(axis=1)) <= cutoff]
+
+
+def _pair_distances(shapes, pairs, cutoff):
+    """
+    returns the DISTANCE_DTYPE array of the *pairs* of *shapes* that are no
+    farther apart than *cutoff*; the pairs for which the distance could not
+    be computed are kept, with nan distance and points
+    """
+    from OCC.Core.BRepExtrema import BRepExtrema_DistShapeShape
+
+    nan_point = (np.nan,) * 3
+    distances = []
+    for i, j in pairs:
+        bdss = BRepExtrema_DistShapeShape()
+        bdss.LoadS1(shapes[i])
+        bdss.LoadS2(shapes[j])
+        bdss.Perform()
+        if not bdss.IsDone():
+            distances.append((i, j, np.nan, nan_point, nan_point))
+        elif bdss.Value() <= cutoff:
+            distances.append(
+                (
+                    i,
+                    j,
+                    bdss.Value(),
+                    bdss.PointOnShape1(1).Coord(),
+                    bdss.PointOnShape2(1).Coord(),
+                )
+            )
+    return np.array(distances, dtype=DISTANCE_DTYPE)
+
+
+def minimum_distances(
+    shapes, cutoff, tol=TOLERANCE, parallel=False, processes=None, chunksize=None
+):
+    """
+    computes the minimum distances between the pairs of *shapes* that are no
+    farther apart than *cutoff*
+
+    the pairs whose bounding boxes are farther apart than cutoff are skipped
+    without computing their distance
+
+    :param shapes: a sequence of TopoDS_*
+    :param cutoff: largest distance of interest
+    :param tol: gap of the bounding boxes, see get_boundingbox
+    :param parallel: split the pairs over worker processes, see
+    Parallel.pair_distances
+    :return: a DISTANCE_DTYPE array, the sparse upper triangle of the
+    distance matrix, ordered by i then j, along with the closest points;
+    scipy.sparse.coo_matrix((d["distance"], (d["i"], d["j"])), (N, N))
+    turns it into a scipy sparse matrix
+    """
+    shapes = list(shapes)
+    pairs = _candidate_pairs(get_boundingboxes(shapes, tol=tol), cutoff)
+    if parallel:
+        from OCCUtils.Parallel import pair_distances
+
+        return pair_distances(shapes, pairs, cutoff, processes, chunksize)
+    return _pair_distances(shapes, pairs, cutoff)
+
+
 def vertex2pnt(vertex):
     """returns a gp_Pnt from a TopoDS_Vertex"""
     from OCC.Core.Core.BRep import BRep_Tool
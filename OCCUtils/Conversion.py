@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+
+##Copyright 2008-2015 Jelle Feringa (jelleferinga@gmail.com)
+##
+##This file is part of pythonOCC.
+##
+##pythonOCC is free software: you can redistribute it and/or modify
+##it under the terms of the GNU Lesser General Public License as published by
+##the Free Software Foundation, either version 3 of the License, or
+##(at your option) any later version.
+##
+##pythonOCC is distributed in the hope that it will be useful,
+##but WITHOUT ANY WARRANTY; without even the implied warranty of
+##MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##GNU Lesser General Public License for more details.
+##
+##You should have received a copy of the GNU Lesser General Public License
+##along with pythonOCC.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+conversion of numpy arrays to TColgp / TColStd arrays, and back
+
+>>> poles = from_numpy(np.array([[0., 0., 0.], [1., 0., 0.]]), TColgp_Array1OfPnt)
+>>> to_numpy(poles)
+
+the OCC arrays are all indexed from 1, as OCC itself does; a sequence of
+gp_Pnt, gp_Vec ... can be passed instead of a numpy array
+"""
+
+import numpy as np
+
+from OCC.Core.TColgp import (
+    TColgp_Array1OfPnt,
+    TColgp_HArray1OfPnt,
+    TColgp_Array1OfPnt2d,
+    TColgp_HArray1OfPnt2d,
+    TColgp_Array1OfVec,
+    TColgp_Array2OfPnt,
+)
+from OCC.Core.TColStd import (
+    TColStd_Array1OfBoolean,
+    TColStd_HArray1OfBoolean,
+    TColStd_Array1OfInteger,
+    TColStd_Array1OfReal,
+    TColStd_HArray1OfReal,
+    TColStd_Array2OfReal,
+)
+from OCC.Core.Geom import Geom_BSplineCurve
+from OCC.Core.gp import gp_Pnt, gp_Pnt2d, gp_Vec
+
+__all__ = ["from_numpy", "to_numpy", "bspline_to_numpy", "bspline_from_numpy"]
+
+# collection type -> ( element type, number of coordinates of an element,
+# 0 for scalars )
+_ELEMENTS = {
+    TColgp_Array1OfPnt: (gp_Pnt, 3),
+    TColgp_HArray1OfPnt: (gp_Pnt, 3),
+    TColgp_Array1OfPnt2d: (gp_Pnt2d, 2),
+    TColgp_HArray1OfPnt2d: (gp_Pnt2d, 2),
+    TColgp_Array1OfVec: (gp_Vec, 3),
+    TColgp_Array2OfPnt: (gp_Pnt, 3),
+    TColStd_Array1OfBoolean: (bool, 0),
+    TColStd_HArray1OfBoolean: (bool, 0),
+    TColStd_Array1OfInteger: (int, 0),
+    TColStd_Array1OfReal: (float, 0),
+    TColStd_HArray1OfReal: (float, 0),
+    TColStd_Array2OfReal: (float, 0),
+}
+
+# collection types indexed by ( row, column )
+_TWO_DIMENSIONAL = (TColgp_Array2OfPnt, TColStd_Array2OfReal)
+
+
+def _elements(values, element_type, width):
+    """
+    returns *values*, ( N, width ) or ( N, ) for scalars, as a flat list of
+    element_type instances or python scalars
+    """
+    if len(values) and hasattr(values[0], "Coord"):
+        # gp_* instances already
+        return list(values)
+    if width == 0:
+        return np.asarray(values).astype(element_type).tolist()
+    rows = np.asarray(values, dtype=np.float64).reshape(-1, width).tolist()
+    return [element_type(*row) for row in rows]
+
+
+def from_numpy(values, collection_type):
+    """
+    returns a collection_type array filled with *values*
+
+    :param values: ( N, 3 ) points or vectors, ( N, 2 ) 2d points, ( N, )
+    scalars, ( N, M, 3 ) or ( N, M ) grids for the Array2 types
+    :param collection_type: one of TColgp_Array1OfPnt, TColgp_HArray1OfPnt,
+    TColgp_Array1OfPnt2d, TColgp_HArray1OfPnt2d, TColgp_Array1OfVec,
+    TColgp_Array2OfPnt, TColStd_Array1OfBoolean, TColStd_HArray1OfBoolean,
+    TColStd_Array1OfInteger, TColStd_Array1OfReal, TColStd_HArray1OfReal or
+    TColStd_Array2OfReal
+    """
+    element_type, width = _ELEMENTS[collection_type]
+    if collection_type in _TWO_DIMENSIONAL:
+        if not hasattr(values, "shape"):
+            values = np.asarray(
+                [[p.Coord() if width else p for p in row] for row in values]
+            )
+        n_rows, n_cols = values.shape[:2]
+        collection = collection_type(1, n_rows, 1, n_cols)
+        flat = values.reshape((n_rows * n_cols, width) if width else -1)
+        elements = _elements(flat, element_type, width)
+        set_value = collection.SetValue
+        for i, element in enumerate(elements):
+            row, col = divmod(i, n_cols)
+            set_value(row + 1, col + 1, element)
+        return collection
+
+    elements = _elements(values, element_type, width)
+    collection = collection_type(1, len(elements))
+    set_value = collection.SetValue
+    for i, element in enumerate(elements, 1):
+        set_value(i, element)
+    return collection
+
+
+def to_numpy(collection):
+    """
+    returns the values of *collection*, one of the types from_numpy
+    accepts, as a numpy array of the shape from_numpy takes
+    """
+    element_type, width = _ELEMENTS[type(collection)]
+    value = collection.Value
+    if type(collection) in _TWO_DIMENSIONAL:
+        rows = range(collection.LowerRow(), collection.UpperRow() + 1)
+        cols = range(collection.LowerCol(), collection.UpperCol() + 1)
+        if width:
+            values = [[value(i, j).Coord() for j in cols] for i in rows]
+            return np.array(values, dtype=np.float64).reshape(len(rows), len(cols), 3)
+        return np.array([[value(i, j) for j in cols] for i in rows], dtype=np.float64)
+
+    indices = range(collection.Lower(), collection.Upper() + 1)
+    if width:
+        values = [value(i).Coord() for i in indices]
+        return np.array(values, dtype=np.float64).reshape(len(indices), width)
+    return np.array([value(i) for i in indices], dtype=element_type)
+
+
+def bspline_to_numpy(curve):
+    """
+    returns the definition of a Geom_BSplineCurve as a dict of numpy arrays,
+    that can be pickled or saved
+
+    :return: a dict with the keys "poles" ( N, 3 ), "weights" ( N, ) or None
+    for a non rational curve, "knots" ( K, ), "multiplicities" ( K, ),
+    "degree" and "periodic"
+    """
+    n_poles, n_knots = curve.NbPoles(), curve.NbKnots()
+    poles = [curve.Pole(i).Coord() for i in range(1, n_poles + 1)]
+    weights = None
+    if curve.IsRational():
+        weights = np.array([curve.Weight(i) for i in range(1, n_poles + 1)])
+    return {
+        "poles": np.array(poles, dtype=np.float64).reshape(n_poles, 3),
+        "weights": weights,
+        "knots": np.array([curve.Knot(i) for i in range(1, n_knots + 1)]),
+        "multiplicities": np.array(
+            [curve.Multiplicity(i) for i in range(1, n_knots + 1)], dtype=np.int64
+        ),
+        "degree": curve.Degree(),
+        "periodic": curve.IsPeriodic(),
+    }
+
+
+def bspline_from_numpy(arrays):
+    """returns the Geom_BSplineCurve defined by a bspline_to_numpy dict"""
+    poles = from_numpy(arrays["poles"], TColgp_Array1OfPnt)
+    knots = from_numpy(arrays["knots"], TColStd_Array1OfReal)
+    multiplicities = from_numpy(arrays["multiplicities"], TColStd_Array1OfInteger)
+    degree, periodic = int(arrays["degree"]), bool(arrays["periodic"])
+    if arrays["weights"] is None:
+        return Geom_BSplineCurve(poles, knots, multiplicities, degree, periodic)
+    weights = from_numpy(arrays["weights"], TColStd_Array1OfReal)
+    return Geom_BSplineCurve(poles, weights, knots, multiplicities, degree, periodic)
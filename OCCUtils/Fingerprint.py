@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+
+##Copyright 2008-2015 Jelle Feringa (jelleferinga@gmail.com)
+##
+##This file is part of pythonOCC.
+##
+##pythonOCC is free software: you can redistribute it and/or modify
+##it under the terms of the GNU Lesser General Public License as published by
+##the Free Software Foundation, either version 3 of the License, or
+##(at your option) any later version.
+##
+##pythonOCC is distributed in the hope that it will be useful,
+##but WITHOUT ANY WARRANTY; without even the implied warranty of
+##MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##GNU Lesser General Public License for more details.
+##
+##You should have received a copy of the GNU Lesser General Public License
+##along with pythonOCC.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+fingerprints that tell whether two shapes are the same part, wherever
+they are placed
+"""
+
+import hashlib
+import json
+
+from OCC.Core.Bnd import Bnd_OBB
+from OCC.Core.BRepAdaptor import BRepAdaptor_Surface
+from OCC.Core.BRepBndLib import brepbndlib_AddOBB
+from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_Transform
+from OCC.Core.gp import gp_Ax3, gp_Dir, gp_Trsf
+
+from OCCUtils.Common import GpropsFromShape, get_boundingbox
+from OCCUtils.Topology import Topo
+from OCCUtils.types_lut import surface_lut
+
+__all__ = ["fingerprint_data", "shape_fingerprint"]
+
+
+def _round(value, digits):
+    """rounds *value* to *digits* significant digits, as a string"""
+    # adding 0. turns -0. into 0.
+    return "%.*g" % (digits, round(value, 12) + 0.0)
+
+
+def _principal_extents(shape, props):
+    """
+    returns the sizes of the box of *shape* aligned on the principal axes
+    of inertia of *props*, a GProp_GProps; None when these axes are not
+    unique, for shapes with an axis or a point of symmetry
+    """
+    principal = props.PrincipalProperties()
+    if principal.HasSymmetryAxis():
+        return None
+    frame = gp_Ax3(
+        props.CentreOfMass(),
+        gp_Dir(principal.ThirdAxisOfInertia()),
+        gp_Dir(principal.FirstAxisOfInertia()),
+    )
+    trsf = gp_Trsf()
+    trsf.SetTransformation(frame)
+    # the shape expressed in the frame of inertia, by its location only
+    local = BRepBuilderAPI_Transform(shape, trsf, False).Shape()
+    xmin, ymin, zmin, xmax, ymax, zmax = get_boundingbox(
+        local, tol=0.0, optimal=True, use_triangulation=False
+    )
+    return xmax - xmin, ymax - ymin, zmax - zmin
+
+
+def _obb_extents(shape):
+    """returns the sizes of the optimal oriented bounding box of *shape*"""
+    obb = Bnd_OBB()
+    # built from the geometry only, not from a triangulation the shape may
+    # or may not have yet
+    brepbndlib_AddOBB(shape, obb, False, True, False)
+    return 2.0 * obb.XHSize(), 2.0 * obb.YHSize(), 2.0 * obb.ZHSize()
+
+
+def fingerprint_data(shape, digits=6):
+    """
+    returns the placement independent properties shape_fingerprint hashes
+
+    :param shape: any TopoDS_*
+    :param digits: number of significant digits the floats are rounded to
+    :return: a dict with the keys
+    "census": number of unique entities per topology type, see Topo.census
+    "surfaces": number of faces per surface type, "plane", "cylinder" ...
+    "volume", "area", "length": the mass properties of the shape
+    "moments": principal moments of inertia of the shape, ascending
+    "extents": sizes of the box aligned on the principal axes of inertia,
+    or of the optimal oriented bounding box when these axes are not
+    unique, ascending
+    """
+    topo = Topo(shape)
+    census = dict((name, count[0]) for name, count in topo.census().items())
+
+    surfaces = {}
+    for face in topo.faces():
+        surface_type = surface_lut[BRepAdaptor_Surface(face, True).GetType()]
+        surfaces[surface_type] = surfaces.get(surface_type, 0) + 1
+
+    gprops = GpropsFromShape(shape)
+    volume = gprops.volume() if census["solid"] else None
+    area = gprops.surface() if census["face"] else None
+    length = gprops.linear() if census["edge"] else None
+    # the moments of inertia of the highest dimension
+    props = volume or area or length
+    if props is not None:
+        moments = sorted(props.PrincipalProperties().Moments())
+    else:
+        moments = []
+
+    # the axes of inertia move with the shape, while the oriented box of a
+    # polyhedral shape is searched from fixed directions
+    extents = None
+    if props is not None:
+        extents = _principal_extents(shape, props)
+    if extents is None:
+        extents = _obb_extents(shape)
+    extents = sorted(extents)
+
+    return {
+        "census": census,
+        "surfaces": surfaces,
+        "volume": _round(volume.Mass(), digits) if volume else None,
+        "area": _round(area.Mass(), digits) if area else None,
+        "length": _round(length.Mass(), digits) if length else None,
+        "moments": [_round(i, digits) for i in moments],
+        "extents": [_round(i, digits) for i in extents],
+    }
+
+
+def shape_fingerprint(shape, digits=6):
+    """
+    returns a hash of the topology, surface types, mass properties and
+    bounding box of *shape*, none of which depend on where the shape is
+    placed: two copies of a part share the same fingerprint
+
+    shapes with different fingerprints are different parts, while shapes
+    sharing a fingerprint are the same part up to the rounding of the
+    properties to *digits* significant digits
+
+    :param shape: any TopoDS_*
+    :param digits: number of significant digits the floats are rounded to
+    :return: a hexadecimal string
+    """
+    data = json.dumps(fingerprint_data(shape, digits), sort_keys=True)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+
+##Copyright 2008-2015 Jelle Feringa (jelleferinga@gmail.com)
+##
+##This file is part of pythonOCC.
+##
+##pythonOCC is free software: you can redistribute it and/or modify
+##it under the terms of the GNU Lesser General Public License as published by
+##the Free Software Foundation, either version 3 of the License, or
+##(at your option) any later version.
+##
+##pythonOCC is distributed in the hope that it will be useful,
+##but WITHOUT ANY WARRANTY; without even the implied warranty of
+##MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##GNU Lesser General Public License for more details.
+##
+##You should have received a copy of the GNU Lesser General Public License
+##along with pythonOCC.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+integer indexed incidence graph of a B-rep, to run graph algorithms over
+the topology of a shape without a query per entity
+"""
+
+import numpy as np
+
+from OCC.Core.TopAbs import (
+    TopAbs_VERTEX,
+    TopAbs_EDGE,
+    TopAbs_WIRE,
+    TopAbs_FACE,
+    TopAbs_SHELL,
+    TopAbs_SOLID,
+)
+from OCC.Core.TopExp import topexp_MapShapes
+from OCC.Core.TopTools import TopTools_IndexedMapOfShape
+from OCC.Core.TopoDS import TopoDS_Iterator
+
+from OCCUtils.types_lut import shape_lut
+
+__all__ = ["TopologyGraph"]
+
+# topology types from the bottom up, a type can only contain types
+# that come before it
+_LEVELS = (
+    TopAbs_VERTEX,
+    TopAbs_EDGE,
+    TopAbs_WIRE,
+    TopAbs_FACE,
+    TopAbs_SHELL,
+    TopAbs_SOLID,
+)
+
+
+def _csr_from_pairs(rows, cols, n_rows, n_cols):
+    """returns the ( indptr, indices ) arrays of the unique ( row, col ) pairs"""
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    keys = np.unique(rows * n_cols + cols)
+    rows, cols = keys // max(n_cols, 1), keys % max(n_cols, 1)
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return indptr, cols
+
+
+def _csr_rows(indptr):
+    """returns the row of every entry of a csr matrix"""
+    return np.repeat(np.arange(len(indptr) - 1, dtype=np.int64), np.diff(indptr))
+
+
+def _csr_compose(a, b):
+    """returns the ( rows, cols ) pairs of the product of csr matrices a and b"""
+    a_indptr, a_indices = a
+    b_indptr, b_indices = b
+    counts = b_indptr[a_indices + 1] - b_indptr[a_indices]
+    rows = np.repeat(_csr_rows(a_indptr), counts)
+    offsets = np.arange(counts.sum(), dtype=np.int64) - np.repeat(
+        np.cumsum(counts) - counts, counts
+    )
+    cols = b_indices[np.repeat(b_indptr[a_indices], counts) + offsets]
+    return rows, cols
+
+
+def _csr_transpose(csr, n_cols):
+    indptr, indices = csr
+    order = np.argsort(indices, kind="stable")
+    t_indptr = np.zeros(n_cols + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=n_cols), out=t_indptr[1:])
+    return t_indptr, _csr_rows(indptr)[order]
+
+
+class TopologyGraph(object):
+    """
+    assigns integer ids to the vertices, edges, wires, faces, shells and
+    solids of a shape, and stores how they are connected as CSR arrays
+
+    the ids of a topology type run from 0 to number_of(type) - 1, in the
+    order Topo(shape).faces(), Topo(shape).edges() ... return the entities
+
+    the graph is built in a single walk over the shape, after which all
+    queries are numpy operations
+
+    >>> graph = TopologyGraph(shape)
+    >>> indptr, indices = graph.incidence(TopAbs_FACE, TopAbs_EDGE)
+    >>> faces_of_first_edge = graph.neighbors(TopAbs_EDGE, 0, TopAbs_FACE)
+    """
+
+    def __init__(self, shape):
+        self.shape = shape
+        # topology type -> shapes of that type, the id is the index - 1
+        self._maps = {}
+        for topologyType in _LEVELS:
+            _map = TopTools_IndexedMapOfShape()
+            topexp_MapShapes(shape, topologyType, _map)
+            self._maps[topologyType] = _map
+        # ( parent type, child type ) -> ( indptr, indices )
+        self._incidence = {}
+        self._build()
+
+    def _build(self):
+        # walk every TShape + Location once, recording which entity directly
+        # contains which one; nodes are numbered by their index in shape_map
+        shape_map = TopTools_IndexedMapOfShape()
+        shape_map.Add(self.shape)
+        node_level, node_id = [-1], [-1]
+        parents, children = [], []
+        i = 1
+        while i <= shape_map.Extent():
+            shp = shape_map.FindKey(i)
+            topologyType = shp.ShapeType()
+            if topologyType in self._maps:
+                node_level.append(_LEVELS.index(topologyType))
+                node_id.append(self._maps[topologyType].FindIndex(shp) - 1)
+            else:
+                # compounds and compsolids are not part of the graph
+                node_level.append(-1)
+                node_id.append(-1)
+            it = TopoDS_Iterator(shp)
+            while it.More():
+                parents.append(i)
+                children.append(shape_map.Add(it.Value()))
+                it.Next()
+            i += 1
+        node_level = np.asarray(node_level, dtype=np.int64)
+        node_id = np.asarray(node_id, dtype=np.int64)
+        parents = np.asarray(parents, dtype=np.int64)
+        children = np.asarray(children, dtype=np.int64)
+
+        direct = {}
+        for p_level, parent in enumerate(_LEVELS):
+            for c_level, child in enumerate(_LEVELS[:p_level]):
+                mask = (node_level[parents] == p_level) & (
+                    node_level[children] == c_level
+                )
+                direct[(parent, child)] = _csr_from_pairs(
+                    node_id[parents[mask]],
+                    node_id[children[mask]],
+                    self.number_of(parent),
+                    self.number_of(child),
+                )
+
+        # a type contains another one either directly, or through the types
+        # in between: a face contains the edges of its wires
+        for c_level, child in enumerate(_LEVELS):
+            for p_level in range(c_level + 1, len(_LEVELS)):
+                parent = _LEVELS[p_level]
+                indptr, cols = direct[(parent, child)]
+                rows, cols = [_csr_rows(indptr)], [cols]
+                for middle in _LEVELS[c_level + 1 : p_level]:
+                    r, c = _csr_compose(
+                        direct[(parent, middle)], self._incidence[(middle, child)]
+                    )
+                    rows.append(r)
+                    cols.append(c)
+                self._incidence[(parent, child)] = _csr_from_pairs(
+                    np.concatenate(rows),
+                    np.concatenate(cols),
+                    self.number_of(parent),
+                    self.number_of(child),
+                )
+
+    def number_of(self, topologyType):
+        """returns the number of entities of topologyType"""
+        return self._maps[topologyType].Extent()
+
+    def shape_from_id(self, topologyType, index):
+        """returns the TopoDS_* entity of topologyType with id *index*"""
+        if not 0 <= index < self.number_of(topologyType):
+            raise IndexError("no entity with id %i" % index)
+        return shape_lut(self._maps[topologyType].FindKey(int(index) + 1))
+
+    def id_from_shape(self, shape):
+        """returns the id of *shape*, orientation is not taken into account"""
+        index = self._maps[shape.ShapeType()].FindIndex(shape)
+        if index == 0:
+            raise KeyError("shape is not part of the graph")
+        return index - 1
+
+    def incidence(self, topologyType, otherType):
+        """
+        returns the ( indptr, indices ) CSR arrays relating the entities of
+        topologyType to the entities of otherType they contain, or are
+        contained by; the ids of the entities related to entity i are
+        indices[indptr[i]:indptr[i + 1]]
+        """
+        key = (topologyType, otherType)
+        if key not in self._incidence:
+            if (otherType, topologyType) not in self._incidence:
+                raise ValueError("no incidence between these topology types")
+            self._incidence[key] = _csr_transpose(
+                self._incidence[(otherType, topologyType)], self.number_of(topologyType)
+            )
+        return self._incidence[key]
+
+    def neighbors(self, topologyType, index, otherType):
+        """
+        returns the ids of the otherType entities related to the
+        topologyType entity with id *index*
+        """
+        indptr, indices = self.incidence(topologyType, otherType)
+        return indices[indptr[index] : indptr[index + 1]]
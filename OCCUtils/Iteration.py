@@ -18,7 +18,25 @@
 """
 This module helps looping through topology
 """
+
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
 from OCC.Core.BRep import BRep_Tool
+from OCC.Core.BRepAdaptor import BRepAdaptor_Curve
+from OCC.Core.TopAbs import TopAbs_REVERSED, TopAbs_VERTEX, TopAbs_EDGE
+from OCC.Core.TopExp import topexp_CommonVertex, topexp_MapShapesAndAncestors
+from OCC.Core.TopTools import (
+    TopTools_IndexedDataMapOfShapeListOfShape,
+    TopTools_IndexedMapOfShape,
+    TopTools_ListIteratorOfListOfShape,
+)
+from OCC.Core.TopoDS import TopoDS_Vertex, topods_Edge
+from OCC.Core.gp import gp_Pnt, gp_Vec
 
 from OCCUtils.Topology import WireExplorer, Topo
 from OCCUtils.edge import Edge
@@ -26,46 +44,153 @@ from OCCUtils.edge import Edge
 
 class EdgePairsFromWire(object):
     """
-    helper class to loop through a wire and return ordered pairs of edges
+    the ordered pairs of consecutive edges of a wire
+
+    all pairs are computed at once, ( edge_0, edge_1 ), ( edge_1, edge_2 )
+    ... ( edge_n-1, edge_0 ), and can be iterated over or indexed many times
     """
 
     def __init__(self, wire):
         self.wire = wire
-        self.edge_pairs = []
-        self.prev_edge = None
-        self.we = WireExplorer(self.wire).ordered_edges()
-        self.number_of_edges = self.we.__length_hint__()
-        self.previous_edge = None
-        self.current_edge = None
-        self.first_edge = None
+        self.edges = WireExplorer(self.wire).edges
+        self.number_of_edges = len(self.edges)
+        self.edge_pairs = tuple(
+            (self.edges[i], self.edges[(i + 1) % self.number_of_edges])
+            for i in range(self.number_of_edges)
+        )
         self.index = 0
 
-    def next(self):
-        if self.index == 0:
-            # first edge, need to set self.previous_edge
-            self.previous_edge = next(self.we)
-            self.current_edge = next(self.we)
-            self.first_edge = self.previous_edge  # for the last iteration
-            self.index += 1
-            return [self.previous_edge, self.current_edge]
-        elif self.index == self.number_of_edges - 1:
-            # no next edge
-            self.index += 1
-            return [self.current_edge, self.first_edge]
-        else:
-            self.previous_edge = self.current_edge
-            self.current_edge = next(self.we)
-            self.index += 1
-            return [self.previous_edge, self.current_edge]
+    def __len__(self):
+        return len(self.edge_pairs)
+
+    def __getitem__(self, index):
+        return self.edge_pairs[index]
 
     def __iter__(self):
-        return self
+        return iter(self.edge_pairs)
+
+    def __next__(self):
+        """
+        returns the next [ edge, next edge ] pair, for the callers stepping
+        through the pairs one call at a time; iterating does not use it
+        """
+        if self.index == self.number_of_edges:
+            raise StopIteration
+        self.index += 1
+        return list(self.edge_pairs[self.index - 1])
+
+    next = __next__
+
+    def _end_points_and_tangents(self):
+        """
+        returns the ( start point, start tangent, end point, end tangent )
+        ( N, 3 ) arrays of the edges, following the wire
+        """
+        arrays = np.empty((4, self.number_of_edges, 3))
+        pnt, vec = gp_Pnt(), gp_Vec()
+        for i, edge in enumerate(self.edges):
+            curve = BRepAdaptor_Curve(edge)
+            for j, u in enumerate((curve.FirstParameter(), curve.LastParameter())):
+                curve.D1(u, pnt, vec)
+                arrays[2 * j, i] = pnt.X(), pnt.Y(), pnt.Z()
+                arrays[2 * j + 1, i] = vec.X(), vec.Y(), vec.Z()
+            if edge.Orientation() == TopAbs_REVERSED:
+                arrays[:, i] = arrays[[2, 3, 0, 1], i]
+                arrays[1::2, i] *= -1.0
+        return arrays
+
+    def corners(self, angular_tolerance=1e-6):
+        """
+        returns the corners between the edges of each pair as numpy arrays
+
+        :param angular_tolerance: largest turning angle, in radians, of a
+        tangent continuous corner
+        :return: a dict with the keys
+        "vertex": ( N, 3 ) coordinates of the vertex shared by the edges of
+        each pair, nan when they share no vertex, as the last pair of an
+        open wire
+        "angle": ( N, ) angle, in radians, between the tangent at the end of
+        the first edge and the tangent at the start of the second one
+        "tangent_continuous": ( N, ) True where the angle is within
+        angular_tolerance
+        """
+        vertices = np.full((len(self), 3), np.nan)
+        vertex = TopoDS_Vertex()
+        for i, (edge_a, edge_b) in enumerate(self.edge_pairs):
+            if topexp_CommonVertex(edge_a, edge_b, vertex):
+                pnt = BRep_Tool.Pnt(vertex)
+                vertices[i] = pnt.X(), pnt.Y(), pnt.Z()
+
+        _, start_tangents, _, end_tangents = self._end_points_and_tangents()
+        # the tangent where each pair leaves its first edge and enters the
+        # second one
+        before = end_tangents
+        after = np.roll(start_tangents, -1, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cosines = np.einsum("ij,ij->i", before, after) / (
+                np.linalg.norm(before, axis=1) * np.linalg.norm(after, axis=1)
+            )
+            angles = np.arccos(np.clip(cosines, -1.0, 1.0))
+            angles[np.isnan(vertices[:, 0])] = np.nan
+            continuous = angles <= angular_tolerance
+        return {"vertex": vertices, "angle": angles, "tangent_continuous": continuous}
+
+
+def _edges_by_vertex(wire, vertices):
+    """
+    returns, for each vertex of *vertices*, the list of the edges of *wire*
+    that share it, built from a single ancestor map
+    """
+    ancestors = TopTools_IndexedDataMapOfShapeListOfShape()
+    topexp_MapShapesAndAncestors(wire, TopAbs_VERTEX, TopAbs_EDGE, ancestors)
+    edges_by_vertex = []
+    for vertex in vertices:
+        edges = []
+        # an edge closed on the vertex is listed twice
+        edge_map = TopTools_IndexedMapOfShape()
+        it = TopTools_ListIteratorOfListOfShape(ancestors.FindFromKey(vertex))
+        while it.More():
+            n_seen = edge_map.Extent()
+            if edge_map.Add(it.Value()) > n_seen:
+                edges.append(topods_Edge(it.Value()))
+            it.Next()
+        edges_by_vertex.append(edges)
+    return edges_by_vertex
+
+
+class _ClosestPoints(object):
+    """
+    finds the closest of a fixed set of ( N, 3 ) points to query points,
+    using a KD-tree built once when scipy is available
+    """
+
+    def __init__(self, points):
+        self.points = points
+        self._tree = None
+        if cKDTree is not None and len(points):
+            self._tree = cKDTree(points)
+
+    def indices(self, query_points):
+        """returns the index of the closest point to each of *query_points*"""
+        if self._tree is not None:
+            return self._tree.query(query_points)[1]
+        # brute force, a block of query points at a time to bound the memory
+        points = self.points
+        indices = np.empty(len(query_points), dtype=np.int64)
+        for start in range(0, len(query_points), 1024):
+            block = query_points[start : start + 1024]
+            distances = ((block[:, None, :] - points[None, :, :]) ** 2).sum(axis=2)
+            indices[start : start + 1024] = distances.argmin(axis=1)
+        return indices
 
 
 class LoopWirePairs(object):
     """
     for looping through consequtive wires
     assures that the returned edge pairs are ordered
+
+    the closest vertex of wireB to every vertex of wireA, and the edges
+    sharing each vertex, are computed in the constructor
     """
 
     def __init__(self, wireA, wireB):
@@ -76,32 +201,38 @@ class LoopWirePairs(object):
         self.tp_A = Topo(self.wireA)
         self.tp_B = Topo(self.wireB)
         self.bt = BRep_Tool()
-        self.vertsA = [v for v in self.we_A.ordered_vertices()]
-        self.vertsB = [v for v in self.we_B.ordered_vertices()]
+        self.vertsA = list(self.we_A.vertices)
+        self.vertsB = list(self.we_B.vertices)
 
-        self.edgesA = [v for v in WireExplorer(wireA).ordered_edges()]
-        self.edgesB = [v for v in WireExplorer(wireB).ordered_edges()]
+        self.edgesA = list(self.we_A.edges)
+        self.edgesB = list(self.we_B.edges)
 
         self.pntsB = [self.bt.Pnt(v) for v in self.vertsB]
         self.number_of_vertices = len(self.vertsA)
         self.index = 0
 
+        self._pnts_A = np.array([self.bt.Pnt(v).Coord() for v in self.vertsA])
+        self._pnts_B = np.array([p.Coord() for p in self.pntsB])
+        self._closest_B = _ClosestPoints(self._pnts_B)
+        if self._pnts_A.size and self._pnts_B.size:
+            self._closest = self._closest_B.indices(self._pnts_A)
+        else:
+            self._closest = np.zeros(0, dtype=np.int64)
+        self._edges_A = _edges_by_vertex(self.wireA, self.vertsA)
+        self._edges_B = _edges_by_vertex(self.wireB, self.vertsB)
+
     def closest_point(self, vertexFromWireA):
-        pt = self.bt.Pnt(vertexFromWireA)
-        distances = [pt.Distance(i) for i in self.pntsB]
-        indx_max_dist = distances.index(min(distances))
-        return self.vertsB[indx_max_dist]
+        pt = np.array([self.bt.Pnt(vertexFromWireA).Coord()])
+        return self.vertsB[self._closest_B.indices(pt)[0]]
 
-    def next(self):
+    def __next__(self):
         if self.index == self.number_of_vertices:
             raise StopIteration
 
-        vert = self.vertsA[self.index]
-        closest = self.closest_point(vert)
-        edges_a = self.tp_A.edges_from_vertex(vert)
-        edges_b = self.tp_B.edges_from_vertex(closest)
-        a1, a2 = Edge(next(edges_a)), Edge(next(edges_a))
-        b1, b2 = Edge(next(edges_b)), Edge(next(edges_b))
+        edges_a = self._edges_A[self.index]
+        edges_b = self._edges_B[self._closest[self.index]]
+        a1, a2 = Edge(edges_a[0]), Edge(edges_a[1])
+        b1, b2 = Edge(edges_b[0]), Edge(edges_b[1])
         mpA = a1.mid_point()
         self.index += 1
 
@@ -110,5 +241,7 @@ class LoopWirePairs(object):
         else:
             return iter([a1, a2]), iter([b2, b1])
 
+    next = __next__
+
     def __iter__(self):
         return self
@@ -0,0 +1,380 @@
+#!/usr/bin/env python
+
+##Copyright 2008-2015 Jelle Feringa (jelleferinga@gmail.com)
+##
+##This file is part of pythonOCC.
+##
+##pythonOCC is free software: you can redistribute it and/or modify
+##it under the terms of the GNU Lesser General Public License as published by
+##the Free Software Foundation, either version 3 of the License, or
+##(at your option) any later version.
+##
+##pythonOCC is distributed in the hope that it will be useful,
+##but WITHOUT ANY WARRANTY; without even the implied warranty of
+##MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##GNU Lesser General Public License for more details.
+##
+##You should have received a copy of the GNU Lesser General Public License
+##along with pythonOCC.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+spreads the work on large shapes over worker processes
+
+shapes are shipped to the workers as BRep strings, see shape_to_string
+"""
+
+import bisect
+import multiprocessing
+
+import numpy as np
+
+from OCC.Core.BRep import BRep_Builder
+from OCC.Core.BRepTools import BRepTools_ShapeSet
+from OCC.Core.TopoDS import TopoDS_Compound, TopoDS_Iterator
+
+from OCCUtils.Common import (
+    DISTANCE_DTYPE,
+    RAY_HIT_DTYPE,
+    TOLERANCE,
+    RayCaster,
+    SolidClassifier,
+    _as_points_array,
+    _fit_bsplines,
+    _pair_distances,
+    _subshape_map,
+)
+from OCCUtils.Conversion import bspline_from_numpy
+from OCCUtils.Topology import Topo
+from OCCUtils.types_lut import shape_lut, topo_lut
+
+__all__ = [
+    "shape_to_string",
+    "shape_from_string",
+    "explore_compound",
+    "CompoundExploration",
+    "classify_points",
+    "cast_rays",
+    "pair_distances",
+    "interpolate_curves",
+]
+
+# per worker process state, set by the pool initializers
+_worker = {}
+
+
+def shape_to_string(shape):
+    """
+    serializes a TopoDS_* entity, its location and orientation included,
+    to a BRep string
+    """
+    # the shape is stored as the child of a compound, so that its location
+    # and orientation are written as well
+    builder = BRep_Builder()
+    holder = TopoDS_Compound()
+    builder.MakeCompound(holder)
+    builder.Add(holder, shape)
+    shape_set = BRepTools_ShapeSet()
+    shape_set.Add(holder)
+    return shape_set.WriteToString()
+
+
+def shape_from_string(string):
+    """returns the TopoDS_* entity serialized by shape_to_string"""
+    shape_set = BRepTools_ShapeSet()
+    shape_set.ReadFromString(string)
+    # sub-shapes are stored before the shapes that contain them
+    holder = shape_set.Shape(shape_set.NbShapes())
+    return shape_lut(TopoDS_Iterator(holder).Value())
+
+
+def _pool(processes=None, initializer=None, initargs=()):
+    """returns a pool of *processes* workers, one per core by default"""
+    return multiprocessing.Pool(processes, initializer, initargs)
+
+
+def _census_from_string(string):
+    return Topo(shape_from_string(string)).census()
+
+
+class CompoundExploration(object):
+    """
+    per child counts of an explored compound, and a numbering of the
+    entities of all its children
+
+    the children's entities are numbered one child after the other, in the
+    order Topo(child).faces(), Topo(child).edges() ... return them
+    an entity shared by several children is numbered once for each child
+    """
+
+    def __init__(self, children, censuses):
+        self.children = children
+        self.censuses = censuses
+        # topology name -> id of the first entity of each child
+        self.offsets = {}
+        for name in censuses[0] if censuses else []:
+            offsets = [0]
+            for census in censuses:
+                offsets.append(offsets[-1] + census[name][0])
+            self.offsets[name] = offsets
+        self._maps = {}
+
+    def counts(self, name):
+        """
+        returns the number of unique entities of each child
+        :param name: a topology name, "face", "edge", "vertex" ...
+        """
+        return [census[name][0] for census in self.censuses]
+
+    def number_of(self, name):
+        """returns the number of entities over all children"""
+        if name not in self.offsets:
+            return 0
+        return self.offsets[name][-1]
+
+    def locate(self, name, index):
+        """returns the ( child index, id within the child ) of entity *index*"""
+        if not 0 <= index < self.number_of(name):
+            raise IndexError("no %s with id %i" % (name, index))
+        offsets = self.offsets[name]
+        child = bisect.bisect_right(offsets, index) - 1
+        return child, index - offsets[child]
+
+    def _child_map(self, child, name):
+        key = (child, name)
+        if key not in self._maps:
+            self._maps[key] = _subshape_map(self.children[child], topo_lut[name])
+        return self._maps[key]
+
+    def shape_from_id(self, name, index):
+        """returns the TopoDS_* entity numbered *index*"""
+        child, local_index = self.locate(name, index)
+        return shape_lut(self._child_map(child, name).FindKey(local_index + 1))
+
+    def id_from_shape(self, child, shape):
+        """returns the number of *shape*, a sub-shape of the child *child*"""
+        name = topo_lut[shape.ShapeType()]
+        local_index = self._child_map(child, name).FindIndex(shape)
+        if local_index == 0:
+            raise KeyError("shape is not part of child %i" % child)
+        return self.offsets[name][child] + local_index - 1
+
+
+def explore_compound(compound, processes=None, chunksize=None):
+    """
+    explores the direct children of *compound*, typically the solids of an
+    assembly, each in a worker process
+
+    :param compound: TopoDS_Compound
+    :param processes: number of worker processes, one per core by default
+    :param chunksize: number of children sent to a worker at once, by
+    default the children are split in 4 chunks per worker
+    :return: a CompoundExploration
+
+    the children are serialized in the parent as the pool asks for them,
+    so the workers start on the first ones while the others are written;
+    the maps numbering the entities of a child are built in the parent,
+    on the first shape_from_id or id_from_shape call for that child
+    """
+    children = []
+    it = TopoDS_Iterator(compound)
+    while it.More():
+        children.append(shape_lut(it.Value()))
+        it.Next()
+    strings = (shape_to_string(child) for child in children)
+    chunksize = _chunksize(len(children), processes, chunksize)
+    pool = _pool(processes)
+    try:
+        censuses = list(pool.imap(_census_from_string, strings, chunksize))
+    finally:
+        pool.close()
+        pool.join()
+    return CompoundExploration(children, censuses)
+
+
+def _chunksize(n_items, processes=None, chunksize=None):
+    """returns *chunksize*, by default the size of 4 chunks per worker"""
+    if chunksize is None:
+        n_chunks = 4 * (processes or multiprocessing.cpu_count())
+        chunksize = max(1, -(-n_items // n_chunks))
+    return chunksize
+
+
+def _chunk_starts(n_items, processes=None, chunksize=None):
+    """
+    returns the index of the first item of each chunk, by default the items
+    are split in 4 chunks per worker
+    """
+    return range(0, n_items, _chunksize(n_items, processes, chunksize))
+
+
+def _init_classifier(string, tolerance):
+    _worker["classifier"] = SolidClassifier(shape_from_string(string), tolerance)
+
+
+def _classify_chunk(points):
+    return _worker["classifier"].classify(points)
+
+
+def classify_points(solid, points, tolerance=1e-5, processes=None, chunksize=None):
+    """
+    classifies points against a solid, splitting the points over worker
+    processes that each load the solid once
+
+    :param solid: TopoDS_Solid
+    :param points: ( N, 3 ) array, or a list of gp_Pnt
+    :param processes: number of worker processes, one per core by default
+    :param chunksize: number of points sent to a worker at once, by default
+    the points are split in 4 chunks per worker
+    :return: ( N, ) int8 array of TopAbs_IN, TopAbs_OUT or TopAbs_ON
+    """
+    points = _as_points_array(points)
+    starts = _chunk_starts(len(points), processes, chunksize)
+    chunks = [points[i : i + starts.step] for i in starts]
+    pool = _pool(processes, _init_classifier, (shape_to_string(solid), tolerance))
+    try:
+        states = pool.map(_classify_chunk, chunks)
+    finally:
+        pool.close()
+        pool.join()
+    if not states:
+        return np.zeros(0, dtype=np.int8)
+    return np.concatenate(states)
+
+
+def _init_ray_caster(string, tolerance):
+    _worker["ray_caster"] = RayCaster(shape_from_string(string), tolerance)
+
+
+def _cast_chunk(args):
+    start, origins, directions, nearest = args
+    hits = _worker["ray_caster"].cast(origins, directions, nearest)
+    hits["ray"] += start
+    return hits
+
+
+def cast_rays(
+    shape,
+    origins,
+    directions,
+    nearest=True,
+    tolerance=TOLERANCE,
+    processes=None,
+    chunksize=None,
+):
+    """
+    intersects rays with a shape, splitting the rays over worker processes
+    that each load the shape once; see Common.RayCaster.cast
+
+    the pythonocc wrappers hold the GIL, so threads would not run the
+    intersections concurrently, processes do
+
+    :param processes: number of worker processes, one per core by default
+    :param chunksize: number of rays sent to a worker at once, by default
+    the rays are split in 4 chunks per worker
+    :return: a Common.RAY_HIT_DTYPE array of the hits
+    """
+    origins = _as_points_array(origins)
+    directions = np.broadcast_to(_as_points_array(directions), origins.shape)
+    starts = _chunk_starts(len(origins), processes, chunksize)
+    chunks = [
+        (i, origins[i : i + starts.step], directions[i : i + starts.step], nearest)
+        for i in starts
+    ]
+    pool = _pool(processes, _init_ray_caster, (shape_to_string(shape), tolerance))
+    try:
+        hits = pool.map(_cast_chunk, chunks)
+    finally:
+        pool.close()
+        pool.join()
+    if not hits:
+        return np.zeros(0, dtype=RAY_HIT_DTYPE)
+    return np.concatenate(hits)
+
+
+def _init_shapes(strings):
+    _worker["shapes"] = [shape_from_string(string) for string in strings]
+
+
+def _pair_distances_chunk(args):
+    pairs, cutoff = args
+    return _pair_distances(_worker["shapes"], pairs, cutoff)
+
+
+def pair_distances(shapes, pairs, cutoff, processes=None, chunksize=None):
+    """
+    computes the minimum distances of *pairs* of *shapes*, splitting the
+    pairs over worker processes that each load all the shapes once; see
+    Common.minimum_distances
+
+    :param pairs: ( M, 2 ) array of indices in *shapes*
+    :param processes: number of worker processes, one per core by default
+    :param chunksize: number of pairs sent to a worker at once, by default
+    the pairs are split in 4 chunks per worker
+    :return: a Common.DISTANCE_DTYPE array of the pairs no farther apart
+    than *cutoff*
+    """
+    starts = _chunk_starts(len(pairs), processes, chunksize)
+    chunks = [(pairs[i : i + starts.step], cutoff) for i in starts]
+    strings = [shape_to_string(shape) for shape in shapes]
+    pool = _pool(processes, _init_shapes, (strings,))
+    try:
+        distances = pool.map(_pair_distances_chunk, chunks)
+    finally:
+        pool.close()
+        pool.join()
+    if not distances:
+        return np.zeros(0, dtype=DISTANCE_DTYPE)
+    return np.concatenate(distances)
+
+
+def _fit_chunk(args):
+    return _fit_bsplines(*args)
+
+
+def interpolate_curves(
+    point_arrays,
+    tangents=None,
+    approximate=False,
+    closed=False,
+    tolerance=TOLERANCE,
+    as_arrays=False,
+    processes=None,
+    chunksize=None,
+):
+    """
+    fits b-spline curves in worker processes, see Common.interpolate_curves
+
+    the workers send the curves back as bspline_to_numpy dicts, which are
+    turned into Geom_BSplineCurve unless as_arrays is set
+
+    :param processes: number of worker processes, one per core by default
+    :param chunksize: number of curves sent to a worker at once, by default
+    the curves are split in 4 chunks per worker
+    :return: a list of Common.CurveFit, in the order of point_arrays
+    """
+    point_arrays = [_as_points_array(points) for points in point_arrays]
+    starts = _chunk_starts(len(point_arrays), processes, chunksize)
+    chunks = [
+        (
+            i,
+            point_arrays[i : i + starts.step],
+            tangents[i : i + starts.step] if tangents is not None else None,
+            approximate,
+            closed,
+            tolerance,
+            True,
+        )
+        for i in starts
+    ]
+    pool = _pool(processes)
+    try:
+        fits = [fit for chunk in pool.map(_fit_chunk, chunks) for fit in chunk]
+    finally:
+        pool.close()
+        pool.join()
+    if not as_arrays:
+        for fit in fits:
+            if fit.ok:
+                fit.curve = bspline_from_numpy(fit.arrays)
+                fit.arrays = None
+    return fits
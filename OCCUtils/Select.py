@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+
+##Copyright 2008-2015 Jelle Feringa (jelleferinga@gmail.com)
+##
+##This file is part of pythonOCC.
+##
+##pythonOCC is free software: you can redistribute it and/or modify
+##it under the terms of the GNU Lesser General Public License as published by
+##the Free Software Foundation, either version 3 of the License, or
+##(at your option) any later version.
+##
+##pythonOCC is distributed in the hope that it will be useful,
+##but WITHOUT ANY WARRANTY; without even the implied warranty of
+##MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##GNU Lesser General Public License for more details.
+##
+##You should have received a copy of the GNU Lesser General Public License
+##along with pythonOCC.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+selects sub-shapes on their properties:
+
+>>> faces = select(shape).faces()
+>>> planes = faces.where(type="plane", area_gt=10.)
+
+the properties of all the faces are computed at once into numpy columns,
+the first time a predicate needs them, and reused by the later selections
+on the same FaceSelection
+"""
+
+import numpy as np
+
+from OCC.Core.BRepAdaptor import BRepAdaptor_Surface
+from OCC.Core.BRepGProp import brepgprop_SurfaceProperties
+from OCC.Core.GeomAbs import GeomAbs_Plane
+from OCC.Core.GProp import GProp_GProps
+from OCC.Core.TopAbs import TopAbs_REVERSED
+
+from OCCUtils.Common import _as_points_array
+from OCCUtils.Topology import Topo
+from OCCUtils.types_lut import surface_lut
+
+__all__ = ["select", "Selection", "FaceSelection"]
+
+
+def select(shape):
+    """
+    returns the Selection of the sub-shapes of *shape*; keep it, or the
+    FaceSelection it returns, to reuse the computed properties
+    """
+    return Selection(shape)
+
+
+class Selection(object):
+    """
+    entry point of the selections on the sub-shapes of a shape
+    """
+
+    def __init__(self, shape):
+        self.shape = shape
+        self._faces = None
+
+    def faces(self):
+        """returns the FaceSelection of the faces of the shape"""
+        if self._faces is None:
+            self._faces = FaceSelection(self.shape)
+        return self._faces
+
+
+class FaceSelection(object):
+    """
+    the faces of a shape, in the order Topo(shape).faces() returns them,
+    and a table of their properties
+
+    the properties are numpy columns, computed for all faces when first
+    needed:
+    "type": the GeomAbs_SurfaceType of the faces
+    "area": the area of the faces
+    "normal": the ( N, 3 ) unit normals of the planar faces, taking the
+    orientation of the face into account, nan for the other faces
+    """
+
+    def __init__(self, shape):
+        self.entities = list(Topo(shape).faces())
+        self._columns = {}
+
+    def __len__(self):
+        return len(self.entities)
+
+    def _compute_type_and_normal(self):
+        types = np.empty(len(self), dtype=np.int64)
+        normals = np.full((len(self), 3), np.nan)
+        for i, face in enumerate(self.entities):
+            adaptor = BRepAdaptor_Surface(face, True)
+            types[i] = adaptor.GetType()
+            if types[i] == GeomAbs_Plane:
+                axis = adaptor.Plane().Axis().Direction()
+                normals[i] = axis.X(), axis.Y(), axis.Z()
+                if face.Orientation() == TopAbs_REVERSED:
+                    normals[i] *= -1.0
+        self._columns["type"] = types
+        self._columns["normal"] = normals
+
+    def _compute_area(self):
+        areas = np.empty(len(self), dtype=np.float64)
+        for i, face in enumerate(self.entities):
+            props = GProp_GProps()
+            brepgprop_SurfaceProperties(face, props)
+            areas[i] = props.Mass()
+        self._columns["area"] = areas
+
+    def column(self, name):
+        """returns the property column *name*, see FaceSelection"""
+        if name not in self._columns:
+            if name in ("type", "normal"):
+                self._compute_type_and_normal()
+            elif name == "area":
+                self._compute_area()
+            else:
+                raise KeyError("no face property %s" % name)
+        return self._columns[name]
+
+    def mask(
+        self,
+        type=None,
+        area_gt=None,
+        area_lt=None,
+        normal_parallel_to=None,
+        angular_tolerance=1e-6,
+    ):
+        """
+        returns a boolean array, True for the faces that satisfy all the
+        given predicates
+
+        :param type: surface type, a GeomAbs_SurfaceType or a name from
+        types_lut.surface_lut such as "plane" or "cylinder"
+        :param area_gt: keep the faces with a larger area
+        :param area_lt: keep the faces with a smaller area
+        :param normal_parallel_to: keep the planar faces whose normal is
+        parallel, in either direction, to a gp_Dir, gp_Vec or ( x, y, z )
+        :param angular_tolerance: tolerance in radians on the normal
+        """
+        selected = np.ones(len(self), dtype=bool)
+        if type is not None:
+            if isinstance(type, str):
+                type = surface_lut[type]
+            selected &= self.column("type") == type
+        if area_gt is not None:
+            selected &= self.column("area") > area_gt
+        if area_lt is not None:
+            selected &= self.column("area") < area_lt
+        if normal_parallel_to is not None:
+            direction = _as_points_array(normal_parallel_to)[0]
+            direction = direction / np.linalg.norm(direction)
+            cosines = np.abs(self.column("normal").dot(direction))
+            # nan, for the faces that are not planar, compares as False
+            with np.errstate(invalid="ignore"):
+                selected &= cosines >= np.cos(angular_tolerance)
+        return selected
+
+    def where(self, **predicates):
+        """
+        returns the faces that satisfy all the predicates, see mask
+        """
+        return [self.entities[i] for i in np.flatnonzero(self.mask(**predicates))]
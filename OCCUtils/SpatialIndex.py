@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+
+##Copyright 2008-2015 Jelle Feringa (jelleferinga@gmail.com)
+##
+##This file is part of pythonOCC.
+##
+##pythonOCC is free software: you can redistribute it and/or modify
+##it under the terms of the GNU Lesser General Public License as published by
+##the Free Software Foundation, either version 3 of the License, or
+##(at your option) any later version.
+##
+##pythonOCC is distributed in the hope that it will be useful,
+##but WITHOUT ANY WARRANTY; without even the implied warranty of
+##MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##GNU Lesser General Public License for more details.
+##
+##You should have received a copy of the GNU Lesser General Public License
+##along with pythonOCC.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+a bounding volume hierarchy over the bounding boxes of shapes, to find
+the shapes near a point, a box or a ray without testing all of them
+
+>>> index = BoundingVolumeHierarchy.from_shape(shape, TopAbs_FACE)
+>>> faces = [index.shape_from_id(i) for i in index.query_point(pnt)]
+"""
+
+import heapq
+
+import numpy as np
+
+from OCCUtils.Common import (
+    TOLERANCE,
+    _as_points_array,
+    _unique_subshapes,
+    get_boundingboxes,
+)
+from OCCUtils.types_lut import shape_lut
+
+__all__ = ["BoundingVolumeHierarchy"]
+
+
+def _ray_entries(boxes, origin, direction, t_min, t_max):
+    """
+    returns the parameter at which the ray origin + t * direction enters
+    each of the ( N, 6 ) boxes, inf for the boxes it misses
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t1 = (boxes[:, :3] - origin) / direction
+        t2 = (boxes[:, 3:] - origin) / direction
+    near, far = np.minimum(t1, t2), np.maximum(t1, t2)
+    parallel = direction == 0.0
+    if parallel.any():
+        # a ray parallel to a slab is either always or never within it
+        inside = (boxes[:, :3] <= origin) & (origin <= boxes[:, 3:])
+        inside = inside[:, parallel]
+        near[:, parallel] = np.where(inside, -np.inf, np.inf)
+        far[:, parallel] = np.where(inside, np.inf, -np.inf)
+    t_near = np.maximum(near.max(axis=1), t_min)
+    t_far = np.minimum(far.min(axis=1), t_max)
+    return np.where(t_near <= t_far, t_near, np.inf)
+
+
+def _box_distances(boxes, pnt):
+    """returns the distance of *pnt* to each of the ( N, 6 ) boxes"""
+    gaps = np.maximum(np.maximum(boxes[:, :3] - pnt, pnt - boxes[:, 3:]), 0.0)
+    return np.sqrt((gaps ** 2).sum(axis=1))
+
+
+class BoundingVolumeHierarchy(object):
+    """
+    a binary tree of boxes, each node boxing the boxes below it
+
+    the ids the queries return are the rows of the boxes the hierarchy is
+    built from, or the index of the shape when built from shapes
+
+    the boxes are split on the median of their centres along the longest
+    axis, until a leaf holds no more than leaf_size boxes
+    """
+
+    def __init__(self, boxes, leaf_size=8):
+        """
+        :param boxes: ( N, 6 ) array of xmin, ymin, zmin, xmax, ymax, zmax,
+        such as get_boundingboxes returns
+        :param leaf_size: largest number of boxes of a leaf
+        """
+        self.boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 6)
+        self.leaf_size = max(1, leaf_size)
+        self.shapes = None
+        self._build()
+
+    @classmethod
+    def from_shapes(cls, shapes, leaf_size=8, tol=TOLERANCE, optimal=False, cache=None):
+        """
+        returns the hierarchy of the bounding boxes of *shapes*, the ids are
+        the indices in *shapes*
+
+        :param cache: a BoundingBoxCache, see get_boundingbox for tol and
+        optimal
+        """
+        shapes = list(shapes)
+        boxes = get_boundingboxes(shapes, tol=tol, optimal=optimal, cache=cache)
+        index = cls(boxes, leaf_size)
+        index.shapes = shapes
+        return index
+
+    @classmethod
+    def from_shape(
+        cls, shape, topologyType, leaf_size=8, tol=TOLERANCE, optimal=False, cache=None
+    ):
+        """
+        returns the hierarchy of the bounding boxes of the sub-shapes of
+        topologyType of *shape*: all faces of a part, all solids of an
+        assembly ... the ids follow the order of Topo(shape).faces(),
+        Topo(shape).solids() ...
+        """
+        shapes = [shape_lut(i) for i in _unique_subshapes(shape, topologyType)]
+        return cls.from_shapes(shapes, leaf_size, tol, optimal, cache)
+
+    def _build(self):
+        n_boxes = len(self.boxes)
+        centres = (self.boxes[:, :3] + self.boxes[:, 3:]) / 2.0
+        order = np.arange(n_boxes)
+        bounds, children, ranges = [], [], []
+
+        def add_node(start, end):
+            boxes = self.boxes[order[start:end]]
+            bounds.append(np.concatenate([boxes[:, :3].min(0), boxes[:, 3:].max(0)]))
+            children.append((-1, -1))
+            ranges.append((start, end))
+            return len(ranges) - 1
+
+        stack = [add_node(0, n_boxes)] if n_boxes else []
+        while stack:
+            node = stack.pop()
+            start, end = ranges[node]
+            if end - start <= self.leaf_size:
+                continue
+            node_centres = centres[order[start:end]]
+            axis = np.argmax(node_centres.max(0) - node_centres.min(0))
+            middle = (start + end) // 2
+            split = np.argpartition(node_centres[:, axis], middle - start)
+            order[start:end] = order[start:end][split]
+            children[node] = (add_node(start, middle), add_node(middle, end))
+            stack.extend(children[node])
+
+        # the boxes of a leaf are contiguous in the sorted boxes
+        self._order = order
+        self._sorted_boxes = self.boxes[order]
+        self._node_boxes = np.array(bounds).reshape(-1, 6)
+        # python lists are faster than numpy to test one node at a time
+        self._node_bounds = self._node_boxes.tolist()
+        self._node_children = children
+        self._node_ranges = ranges
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def shape_from_id(self, index):
+        """returns the shape with id *index*, when built from shapes"""
+        if self.shapes is None:
+            raise ValueError("the hierarchy was not built from shapes")
+        return self.shapes[index]
+
+    def _query(self, node_overlaps, leaf_mask):
+        """
+        returns the sorted ids of the boxes for which leaf_mask is True,
+        visiting only the nodes for which node_overlaps is True
+        """
+        found = []
+        stack = [0] if len(self) else []
+        while stack:
+            node = stack.pop()
+            if not node_overlaps(self._node_bounds[node]):
+                continue
+            left, right = self._node_children[node]
+            if left < 0:
+                start, end = self._node_ranges[node]
+                mask = leaf_mask(self._sorted_boxes[start:end])
+                found.append(self._order[start:end][mask])
+            else:
+                stack.append(left)
+                stack.append(right)
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return np.sort(np.concatenate(found))
+
+    def query_point(self, pnt, tolerance=0.0):
+        """
+        returns the ids of the boxes that contain *pnt*, a gp_Pnt or
+        ( x, y, z ), within *tolerance*
+        """
+        x, y, z = _as_points_array(pnt)[0].tolist()
+        upper = np.array([x, y, z]) + tolerance
+        lower = np.array([x, y, z]) - tolerance
+
+        def node_overlaps(b):
+            return (
+                b[0] - tolerance <= x <= b[3] + tolerance
+                and b[1] - tolerance <= y <= b[4] + tolerance
+                and b[2] - tolerance <= z <= b[5] + tolerance
+            )
+
+        def leaf_mask(boxes):
+            return ((boxes[:, :3] <= upper) & (lower <= boxes[:, 3:])).all(axis=1)
+
+        return self._query(node_overlaps, leaf_mask)
+
+    def query_box(self, box):
+        """
+        returns the ids of the boxes that overlap *box*, a xmin, ymin, zmin,
+        xmax, ymax, zmax sequence such as get_boundingbox returns
+        """
+        q = np.asarray(box, dtype=np.float64)
+        xmin, ymin, zmin, xmax, ymax, zmax = q.tolist()
+
+        def node_overlaps(b):
+            return (
+                b[0] <= xmax
+                and xmin <= b[3]
+                and b[1] <= ymax
+                and ymin <= b[4]
+                and b[2] <= zmax
+                and zmin <= b[5]
+            )
+
+        def leaf_mask(boxes):
+            return ((boxes[:, :3] <= q[3:]) & (q[:3] <= boxes[:, 3:])).all(axis=1)
+
+        return self._query(node_overlaps, leaf_mask)
+
+    def query_ray(self, origin, direction, t_min=0.0, t_max=np.inf):
+        """
+        returns the ids of the boxes hit by the ray origin + t * direction,
+        t_min <= t <= t_max, ordered by the distance at which the ray enters
+        them
+
+        :param origin: gp_Pnt or ( x, y, z )
+        :param direction: gp_Dir, gp_Vec or ( x, y, z )
+        """
+        origin = _as_points_array(origin)[0]
+        direction = _as_points_array(direction)[0]
+
+        def node_overlaps(b):
+            node = np.array([b])
+            return _ray_entries(node, origin, direction, t_min, t_max)[0] < np.inf
+
+        def leaf_mask(boxes):
+            return _ray_entries(boxes, origin, direction, t_min, t_max) < np.inf
+
+        ids = self._query(node_overlaps, leaf_mask)
+        entries = _ray_entries(self.boxes[ids], origin, direction, t_min, t_max)
+        return ids[np.argsort(entries, kind="stable")]
+
+    def nearest(self, pnt, k=1):
+        """
+        returns the ids of the *k* boxes closest to *pnt*, the closest first;
+        a box containing the point is at distance 0
+
+        :param pnt: gp_Pnt or ( x, y, z )
+        """
+        pnt = _as_points_array(pnt)[0]
+        nearest = []
+        # nodes and boxes, closest first; nodes are pushed as ~node
+        heap = [(0.0, ~0)] if len(self) else []
+        while heap and len(nearest) < k:
+            distance, item = heapq.heappop(heap)
+            if item >= 0:
+                nearest.append(item)
+                continue
+            node = ~item
+            left, right = self._node_children[node]
+            if left < 0:
+                start, end = self._node_ranges[node]
+                distances = _box_distances(self._sorted_boxes[start:end], pnt)
+                for d, i in zip(distances.tolist(), self._order[start:end].tolist()):
+                    heapq.heappush(heap, (d, i))
+            else:
+                distances = _box_distances(self._node_boxes[[left, right]], pnt)
+                heapq.heappush(heap, (float(distances[0]), ~left))
+                heapq.heappush(heap, (float(distances[1]), ~right))
+        return np.array(nearest, dtype=np.int64)
@@ -17,9 +17,12 @@
 ##You should have received a copy of the GNU Lesser General Public License
 ##along with pythonOCC.  If not, see <http://www.gnu.org/licenses/>.
 
-from __future__ import print_function
+import json
+import sys
 
-__all__ = ["Topo", "WireExplorer", "dumpTopology"]
+import numpy as np
+
+__all__ = ["Topo", "IncrementalTopo", "WireExplorer", "dumpTopology", "iter_topology"]
 
 from OCC.Core.BRep import BRep_Tool
 
@@ -34,11 +37,17 @@ from OCC.Core.TopAbs import (
     TopAbs_COMPOUND,
     TopAbs_COMPSOLID,
 )
-from OCC.Core.TopExp import TopExp_Explorer, topexp_MapShapesAndAncestors
+from OCC.Core.TopExp import (
+    TopExp_Explorer,
+    topexp_MapShapes,
+    topexp_MapShapesAndAncestors,
+)
 from OCC.Core.TopTools import (
     TopTools_ListOfShape,
     TopTools_ListIteratorOfListOfShape,
+    TopTools_IndexedMapOfShape,
     TopTools_IndexedDataMapOfShapeListOfShape,
+    TopTools_DataMapOfShapeInteger,
 )
 from OCC.Core.TopoDS import (
     topods,
@@ -55,56 +64,65 @@ from OCC.Core.TopoDS import (
     TopoDS_Iterator,
 )
 
+from OCCUtils.types_lut import topo_lut, orient_lut
+
 
 class WireExplorer(object):
     """
     Wire traversal
+
+    the wire is walked once, its ordered edges and vertices are kept as
+    tuples that can be iterated over many times
     """
 
     def __init__(self, wire):
         assert isinstance(wire, TopoDS_Wire), "not a TopoDS_Wire"
         self.wire = wire
-        self.wire_explorer = BRepTools_WireExplorer(self.wire)
-        self.done = False
-
-    def _reinitialize(self):
-        self.wire_explorer = BRepTools_WireExplorer(self.wire)
-        self.done = False
-
-    def _loop_topo(self, edges=True):
-        if self.done:
-            self._reinitialize()
-        topologyType = topods_Edge if edges else topods_Vertex
-        seq = []
-        hashes = []  # list that stores hashes to avoid redundancy
-        occ_seq = TopTools_ListOfShape()
-        while self.wire_explorer.More():
-            # loop edges
-            if edges:
-                current_item = self.wire_explorer.Current()
-            # loop vertices
-            else:
-                current_item = self.wire_explorer.CurrentVertex()
-            current_item_hash = current_item.__hash__()
-            if not current_item_hash in hashes:
-                hashes.append(current_item_hash)
-                occ_seq.Append(current_item)
-            self.wire_explorer.Next()
-
-        # Convert occ_seq to python list
-        occ_iterator = TopTools_ListIteratorOfListOfShape(occ_seq)
-        while occ_iterator.More():
-            topo_to_add = topologyType(occ_iterator.Value())
-            seq.append(topo_to_add)
-            occ_iterator.Next()
-        self.done = True
-        return iter(seq)
+        self._edges = None
+        self._vertices = None
+
+    def _loop_topo(self):
+        edges, vertices = [], []
+        # maps that store the edges and vertices seen to avoid redundancy
+        edge_map = TopTools_IndexedMapOfShape()
+        vertex_map = TopTools_IndexedMapOfShape()
+        wire_explorer = BRepTools_WireExplorer(self.wire)
+        while wire_explorer.More():
+            current_edge = wire_explorer.Current()
+            n_seen = edge_map.Extent()
+            if edge_map.Add(current_edge) > n_seen:
+                edges.append(topods_Edge(current_edge))
+            current_vertex = wire_explorer.CurrentVertex()
+            n_seen = vertex_map.Extent()
+            if vertex_map.Add(current_vertex) > n_seen:
+                vertices.append(topods_Vertex(current_vertex))
+            wire_explorer.Next()
+        self._edges = tuple(edges)
+        self._vertices = tuple(vertices)
+
+    @property
+    def edges(self):
+        """the edges of the wire, in the order they are connected"""
+        if self._edges is None:
+            self._loop_topo()
+        return self._edges
+
+    @property
+    def vertices(self):
+        """the vertices of the wire, in the order they are connected"""
+        if self._vertices is None:
+            self._loop_topo()
+        return self._vertices
 
     def ordered_edges(self):
-        return self._loop_topo(edges=True)
+        return iter(self.edges)
 
     def ordered_vertices(self):
-        return self._loop_topo(edges=False)
+        return iter(self.vertices)
+
+    def __len__(self):
+        """returns the number of edges of the wire"""
+        return len(self.edges)
 
 
 class Topo(object):
@@ -112,7 +130,7 @@ class Topo(object):
     Topology traversal
     """
 
-    def __init__(self, myShape, ignore_orientation=False):
+    def __init__(self, myShape, ignore_orientation=False, lazy=False):
         """
 
         implements topology traversal from any TopoDS_Shape
@@ -139,9 +157,16 @@ class Topo(object):
 
         for further reference see TopoDS_Shape IsEqual / IsSame methods
 
+        :param lazy: when True, faces(), edges() and the other traversals
+        return generators that yield the sub-shapes as the TopExp_Explorer
+        reaches them, rather than exploring the complete shape first.
+        sub-shapes are still returned only once: the generator keeps the
+        sub-shapes seen so far, not the ones still to be explored
+
         """
         self.myShape = myShape
         self.ignore_orientation = ignore_orientation
+        self.lazy = lazy
 
         # the topoFactory dicts maps topology types and functions that can
         # create this topology
@@ -155,6 +180,48 @@ class Topo(object):
             TopAbs_COMPOUND: topods.Compound,
             TopAbs_COMPSOLID: topods.CompSolid,
         }
+        # ancestor maps, keyed by ( topoTypeA, topoTypeB )
+        self._ancestor_maps = {}
+        # maps numbering the entities of a topology type of self.myShape
+        self._shape_maps = {}
+        self._census = None
+        # wire explorers, keyed by ( index in _wire_map, orientation )
+        self._wire_map = TopTools_IndexedMapOfShape()
+        self._wire_explorers = {}
+
+    def invalidate(self):
+        """
+        drops the cached ancestor maps, shape maps and census
+        call this method when self.myShape has been modified
+        """
+        self._ancestor_maps.clear()
+        self._shape_maps.clear()
+        self._census = None
+        self._wire_map.Clear()
+        self._wire_explorers.clear()
+
+    def _shape_map(self, topologyType):
+        """
+        returns the map of the unique topologyType entities of self.myShape,
+        in the order the traversals return them
+        """
+        if topologyType not in self._shape_maps:
+            _map = TopTools_IndexedMapOfShape()
+            topexp_MapShapes(self.myShape, topologyType, _map)
+            self._shape_maps[topologyType] = _map
+        return self._shape_maps[topologyType]
+
+    def _ancestor_map(self, topoTypeA, topoTypeB):
+        """
+        returns the map of the topoTypeA entities of self.myShape to their
+        topoTypeB ancestors, the map is built on first use only
+        """
+        key = (topoTypeA, topoTypeB)
+        if key not in self._ancestor_maps:
+            _map = TopTools_IndexedDataMapOfShapeListOfShape()
+            topexp_MapShapesAndAncestors(self.myShape, topoTypeA, topoTypeB, _map)
+            self._ancestor_maps[key] = _map
+        return self._ancestor_maps[key]
 
     def _loop_topo(
         self, topologyType, topologicalEntity=None, topologyTypeToAvoid=None
@@ -180,65 +247,128 @@ class Topo(object):
             topologyType,
             topoTypes.keys(),
         )
-        self.topExp = TopExp_Explorer()
         # use self.myShape if nothing is specified
-        if topologicalEntity is None and topologyTypeToAvoid is None:
-            self.topExp.Init(self.myShape, topologyType)
-        elif topologicalEntity is None and topologyTypeToAvoid is not None:
-            self.topExp.Init(self.myShape, topologyType, topologyTypeToAvoid)
-        elif topologyTypeToAvoid is None:
-            self.topExp.Init(topologicalEntity, topologyType)
-        elif topologyTypeToAvoid:
-            self.topExp.Init(topologicalEntity, topologyType, topologyTypeToAvoid)
-        seq = []
-        hashes = []  # list that stores hashes to avoid redundancy
-        occ_seq = TopTools_ListOfShape()
-        while self.topExp.More():
-            current_item = self.topExp.Current()
-            current_item_hash = current_item.__hash__()
-
-            if not current_item_hash in hashes:
-                hashes.append(current_item_hash)
-                occ_seq.Append(current_item)
-
-            self.topExp.Next()
-        # Convert occ_seq to python list
-        occ_iterator = TopTools_ListIteratorOfListOfShape(occ_seq)
-        while occ_iterator.More():
-            topo_to_add = self.topoFactory[topologyType](occ_iterator.Value())
-            seq.append(topo_to_add)
-            occ_iterator.Next()
+        if topologicalEntity is None:
+            topologicalEntity = self.myShape
+        if self.lazy:
+            return self._stream_topo(
+                topologyType, topologicalEntity, topologyTypeToAvoid
+            )
+        factory = self.topoFactory[topologyType]
+        # a TopTools_IndexedMapOfShape hashes on TShape + Location, which
+        # makes the redundancy check O(1) and the traversal linear in the
+        # number of explored sub-shapes
+        occ_map = TopTools_IndexedMapOfShape()
+        if topologyTypeToAvoid is None:
+            # exploration and deduplication both run in C++
+            if topologicalEntity is self.myShape:
+                occ_map = self._shape_map(topologyType)
+            else:
+                topexp_MapShapes(topologicalEntity, topologyType, occ_map)
+            seq = [
+                factory(occ_map.FindKey(i)) for i in range(1, occ_map.Extent() + 1)
+            ]
+        else:
+            seq = list(
+                self._stream_topo(topologyType, topologicalEntity, topologyTypeToAvoid)
+            )
 
         if self.ignore_orientation:
-            # filter out those entities that share the same TShape
-            # but do *not* share the same orientation
-            filter_orientation_seq = []
-            for i in seq:
-                _present = False
-                for j in filter_orientation_seq:
-                    if i.IsSame(j):
-                        _present = True
-                        break
-                if _present is False:
-                    filter_orientation_seq.append(i)
-            return filter_orientation_seq
+            # entities that share the same TShape but do *not* share the same
+            # orientation have already been filtered out: the indexed map
+            # tells shapes apart on TShape and Location only, as IsSame does
+            return seq
         else:
             return iter(seq)
 
+    def _stream_topo(self, topologyType, topologicalEntity, topologyTypeToAvoid=None):
+        """
+        generator yielding the unique topologyType sub-shapes of
+        topologicalEntity in the order the TopExp_Explorer finds them
+        """
+        factory = self.topoFactory[topologyType]
+        occ_map = TopTools_IndexedMapOfShape()
+        # a local explorer, so that several generators can run side by side
+        topExp = TopExp_Explorer()
+        if topologyTypeToAvoid is None:
+            topExp.Init(topologicalEntity, topologyType)
+        else:
+            topExp.Init(topologicalEntity, topologyType, topologyTypeToAvoid)
+        while topExp.More():
+            current_item = topExp.Current()
+            n_seen = occ_map.Extent()
+            if occ_map.Add(current_item) > n_seen:
+                # the cast copies the shape the explorer currently points to
+                yield factory(current_item)
+            topExp.Next()
+
+    def census(self):
+        """
+        counts the topological entities of self.myShape in a single walk,
+        without casting any of them to its TopoDS_* type
+
+        every TShape + Location is walked once, the number of occurrences
+        of the shared entities is propagated from their parents
+
+        for instance, a box has 12 unique edges that occur 24 times
+        ( twice in each face ) and 8 unique vertices that occur 48 times
+
+        :return: a dict that maps the names "vertex", "edge", "wire", "face",
+        "shell", "solid", "compsolid" and "compound" to a tuple
+        ( number of unique entities, number of occurrences )
+        """
+        if self._census is not None:
+            return dict(self._census)
+        # number the unique entities, children[i] lists the indices of the
+        # sub-shapes of entity i, shared ones as many times as they occur
+        shape_map = TopTools_IndexedMapOfShape()
+        shape_map.Add(self.myShape)
+        children = [None]
+        i = 1
+        while i <= shape_map.Extent():
+            it = TopoDS_Iterator(shape_map.FindKey(i))
+            sub_shapes = []
+            while it.More():
+                sub_shapes.append(shape_map.Add(it.Value()))
+                it.Next()
+            children.append(sub_shapes)
+            i += 1
+        n_shapes = shape_map.Extent()
+        # propagate the occurrences from the parents to the children,
+        # a child is handled once all of its parents have been
+        n_parents = [0] * (n_shapes + 1)
+        for sub_shapes in children[1:]:
+            for j in sub_shapes:
+                n_parents[j] += 1
+        occurrences = [0] * (n_shapes + 1)
+        occurrences[1] = 1
+        ready = [1]
+        while ready:
+            i = ready.pop()
+            for j in children[i]:
+                occurrences[j] += occurrences[i]
+                n_parents[j] -= 1
+                if n_parents[j] == 0:
+                    ready.append(j)
+        counts = dict((topo_lut[t], [0, 0]) for t in self.topoFactory)
+        for i in range(1, n_shapes + 1):
+            count = counts[topo_lut[shape_map.FindKey(i).ShapeType()]]
+            count[0] += 1
+            count[1] += occurrences[i]
+        self._census = dict((k, tuple(v)) for k, v in counts.items())
+        return dict(self._census)
+
+    def _number_of_unique(self, topologyType):
+        return self._shape_map(topologyType).Extent()
+
     def faces(self):
         """
         loops over all faces
         """
         return self._loop_topo(TopAbs_FACE)
 
-    def _number_of_topo(self, iterable):
-        n = 0
-        for i in iterable:
-            n += 1
-        return n
-
     def number_of_faces(self):
-        return self._number_of_topo(self.faces())
+        return self._number_of_unique(TopAbs_FACE)
 
     def vertices(self):
         """
@@ -247,7 +377,7 @@ class Topo(object):
         return self._loop_topo(TopAbs_VERTEX)
 
     def number_of_vertices(self):
-        return self._number_of_topo(self.vertices())
+        return self._number_of_unique(TopAbs_VERTEX)
 
     def edges(self):
         """
@@ -256,7 +386,7 @@ class Topo(object):
         return self._loop_topo(TopAbs_EDGE)
 
     def number_of_edges(self):
-        return self._number_of_topo(self.edges())
+        return self._number_of_unique(TopAbs_EDGE)
 
     def wires(self):
         """
@@ -265,7 +395,7 @@ class Topo(object):
         return self._loop_topo(TopAbs_WIRE)
 
     def number_of_wires(self):
-        return self._number_of_topo(self.wires())
+        return self._number_of_unique(TopAbs_WIRE)
 
     def shells(self):
         """
@@ -274,7 +404,7 @@ class Topo(object):
         return self._loop_topo(TopAbs_SHELL, None)
 
     def number_of_shells(self):
-        return self._number_of_topo(self.shells())
+        return self._number_of_unique(TopAbs_SHELL)
 
     def solids(self):
         """
@@ -283,7 +413,7 @@ class Topo(object):
         return self._loop_topo(TopAbs_SOLID, None)
 
     def number_of_solids(self):
-        return self._number_of_topo(self.solids())
+        return self._number_of_unique(TopAbs_SOLID)
 
     def comp_solids(self):
         """
@@ -292,7 +422,7 @@ class Topo(object):
         return self._loop_topo(TopAbs_COMPSOLID)
 
     def number_of_comp_solids(self):
-        return self._number_of_topo(self.comp_solids())
+        return self._number_of_unique(TopAbs_COMPSOLID)
 
     def compounds(self):
         """
@@ -301,27 +431,35 @@ class Topo(object):
         return self._loop_topo(TopAbs_COMPOUND)
 
     def number_of_compounds(self):
-        return self._number_of_topo(self.compounds())
+        return self._number_of_unique(TopAbs_COMPOUND)
+
+    def _wire_explorer(self, wire):
+        """
+        returns the WireExplorer of *wire*, which is created once
+        """
+        # a reversed wire is walked in the opposite direction
+        key = (self._wire_map.Add(wire), wire.Orientation())
+        if key not in self._wire_explorers:
+            self._wire_explorers[key] = WireExplorer(wire)
+        return self._wire_explorers[key]
 
     def ordered_vertices_from_wire(self, wire):
         """
         @param wire: TopoDS_Wire
         """
-        we = WireExplorer(wire)
-        return we.ordered_vertices()
+        return self._wire_explorer(wire).ordered_vertices()
 
     def number_of_ordered_vertices_from_wire(self, wire):
-        return self._number_of_topo(self.ordered_vertices_from_wire(wire))
+        return len(self._wire_explorer(wire).vertices)
 
     def ordered_edges_from_wire(self, wire):
         """
         @param wire: TopoDS_Wire
         """
-        we = WireExplorer(wire)
-        return we.ordered_edges()
+        return self._wire_explorer(wire).ordered_edges()
 
     def number_of_ordered_edges_from_wire(self, wire):
-        return self._number_of_topo(self.ordered_edges_from_wire(wire))
+        return len(self._wire_explorer(wire))
 
     def _map_shapes_and_ancestors(self, topoTypeA, topoTypeB, topologicalEntity):
         """
@@ -331,12 +469,15 @@ class Topo(object):
         @param topologicalEntity:
         """
         topo_set = set()
-        _map = TopTools_IndexedDataMapOfShapeListOfShape()
-        topexp_MapShapesAndAncestors(self.myShape, topoTypeA, topoTypeB, _map)
+        # keep a reference to the map, *results* points into it
+        _map = self._ancestor_map(topoTypeA, topoTypeB)
         results = _map.FindFromKey(topologicalEntity)
         if results.Size() == 0:
             yield None
 
+        # with ignore_orientation, entities are compared on TShape and
+        # Location only, which is how TopTools_IndexedMapOfShape hashes them
+        same_map = TopTools_IndexedMapOfShape()
         topology_iterator = TopTools_ListIteratorOfListOfShape(results)
         while topology_iterator.More():
 
@@ -346,12 +487,8 @@ class Topo(object):
             # to assure we're not returning entities several times
             if not topo_entity in topo_set:
                 if self.ignore_orientation:
-                    unique = True
-                    for i in topo_set:
-                        if i.IsSame(topo_entity):
-                            unique = False
-                            break
-                    if unique:
+                    n_seen = same_map.Extent()
+                    if same_map.Add(topo_entity) > n_seen:
                         yield topo_entity
                 else:
                     yield topo_entity
@@ -369,8 +506,8 @@ class Topo(object):
         @param topologicalEntity:
         """
         topo_set = set()
-        _map = TopTools_IndexedDataMapOfShapeListOfShape()
-        topexp_MapShapesAndAncestors(self.myShape, topoTypeA, topoTypeB, _map)
+        # keep a reference to the map, *results* points into it
+        _map = self._ancestor_map(topoTypeA, topoTypeB)
         results = _map.FindFromKey(topologicalEntity)
         if results.Size() == 0:
             return None
@@ -413,6 +550,44 @@ class Topo(object):
             cnt += 1
         return cnt
 
+    def face_adjacency(self):
+        """
+        computes which faces neighbor one another, and across which edge,
+        from a single edge to face ancestor map
+
+        faces and edges are identified by their position in the sequences
+        returned by faces() and edges()
+
+        :return: ( adjacency, valence ) numpy arrays
+        adjacency holds a ( face_i, face_j, shared_edge ) row, face_i < face_j,
+        for every pair of faces sharing an edge
+        valence[edge] is the number of faces that use edge: 1 for a free
+        edge ( or a seam ), more than 2 for a non-manifold edge
+        """
+        face_map = self._shape_map(TopAbs_FACE)
+        edge_map = self._shape_map(TopAbs_EDGE)
+        _map = self._ancestor_map(TopAbs_EDGE, TopAbs_FACE)
+        valence = np.zeros(edge_map.Extent(), dtype=np.int64)
+        adjacency = []
+        for i in range(1, _map.Extent() + 1):
+            edge_id = edge_map.FindIndex(_map.FindKey(i)) - 1
+            face_ids = []
+            topology_iterator = TopTools_ListIteratorOfListOfShape(
+                _map.FindFromIndex(i)
+            )
+            while topology_iterator.More():
+                face_id = face_map.FindIndex(topology_iterator.Value()) - 1
+                if face_id not in face_ids:
+                    face_ids.append(face_id)
+                topology_iterator.Next()
+            valence[edge_id] = len(face_ids)
+            face_ids.sort()
+            for n, face_i in enumerate(face_ids):
+                for face_j in face_ids[n + 1 :]:
+                    adjacency.append((face_i, face_j, edge_id))
+        adjacency = np.array(adjacency, dtype=np.int64).reshape(-1, 3)
+        return adjacency, valence
+
     # ======================================================================
     # VERTEX <-> EDGE
     # ======================================================================
@@ -507,45 +682,308 @@ class Topo(object):
         return cnt
 
 
-def dumpTopology(shape, level=0):
+class _ReShapeHistory(object):
     """
-    Print the details of an object from the top down
+    presents the ShapeBuild_ReShape context of a ShapeFix_Shape
+    with the history methods of a BRepBuilderAPI_MakeShape
     """
-    brt = BRep_Tool()
-    s = shape.ShapeType()
-    if s == TopAbs_VERTEX:
-        pnt = brt.Pnt(topods_Vertex(shape))
-        print(
-            ".." * level
-            + "<Vertex %i: %s %s %s>" % (hash(shape), pnt.X(), pnt.Y(), pnt.Z())
+
+    def __init__(self, fixer):
+        self.fixer = fixer
+        self.context = fixer.Context()
+        self._modified = TopTools_ListOfShape()
+
+    def Shape(self):
+        return self.fixer.Shape()
+
+    def IsDeleted(self, shape):
+        return self.context.Value(shape).IsNull()
+
+    def Modified(self, shape):
+        self._modified.Clear()
+        value = self.context.Value(shape)
+        if value.IsNull() or value.IsEqual(shape):
+            return self._modified
+        # a shape split by the fix is replaced by a compound of its parts
+        stack = [value]
+        while stack:
+            value = stack.pop()
+            if value.ShapeType() != TopAbs_COMPOUND:
+                self._modified.Append(value)
+                continue
+            it = TopoDS_Iterator(value)
+            while it.More():
+                stack.append(it.Value())
+                it.Next()
+        return self._modified
+
+    def Generated(self, shape):
+        return TopTools_ListOfShape()
+
+
+class IncrementalTopo(Topo):
+    """
+    Topo that assigns ids to the faces, edges and vertices of its shape,
+    and keeps them valid across modeling operations
+
+    after a modeling operation, update() takes the history of the builder
+    to retire the ids of the deleted and modified entities and to number
+    the entities that replace them, the other entities keep their id; data
+    cached per entity id thus remains valid for the unchanged entities
+
+    only the ids are updated incrementally: the maps of the shape, its
+    ancestor maps and census, are rebuilt for the result, see update()
+
+    >>> topo = IncrementalTopo(shape)
+    >>> cut = BRepAlgoAPI_Cut(shape, tool)
+    >>> changes = topo.update(cut)
+    >>> # faces that have been cut, and the ids of their remaining parts
+    >>> changes["face"]["modified"]
+    """
+
+    _TRACKED = (TopAbs_FACE, TopAbs_EDGE, TopAbs_VERTEX)
+
+    def __init__(self, myShape, ignore_orientation=False):
+        super(IncrementalTopo, self).__init__(myShape, ignore_orientation)
+        # topology type -> shape to id map, id to shape list ( None once
+        # the id is retired )
+        self._ids = {}
+        self._shapes = {}
+        for topologyType in self._TRACKED:
+            self._ids[topologyType] = TopTools_DataMapOfShapeInteger()
+            self._shapes[topologyType] = []
+            self._number_current(topologyType)
+
+    def _number_current(self, topologyType):
+        """
+        numbers the topologyType entities of self.myShape that have no id
+        yet, and retires the ids of the entities no longer part of it
+        :return: the retired ids
+        """
+        _map = self._shape_map(topologyType)
+        for i in range(1, _map.Extent() + 1):
+            self._bind(_map.FindKey(i))
+        retired = []
+        for index, shp in enumerate(self._shapes[topologyType]):
+            if shp is not None and _map.FindIndex(shp) == 0:
+                self._retire(shp)
+                retired.append(index)
+        return retired
+
+    def _bind(self, shape):
+        """numbers *shape* unless it has been already"""
+        topologyType = shape.ShapeType()
+        id_map = self._ids[topologyType]
+        if id_map.IsBound(shape):
+            return id_map.Find(shape)
+        shapes = self._shapes[topologyType]
+        id_map.Bind(shape, len(shapes))
+        shapes.append(self.topoFactory[topologyType](shape))
+        return len(shapes) - 1
+
+    def _retire(self, shape):
+        topologyType = shape.ShapeType()
+        index = self._ids[topologyType].Find(shape)
+        self._ids[topologyType].UnBind(shape)
+        self._shapes[topologyType][index] = None
+        return index
+
+    def id_from_shape(self, shape):
+        """
+        returns the id of *shape*, a face, edge or vertex of self.myShape
+        orientation is not taken into account
+        """
+        id_map = self._ids.get(shape.ShapeType())
+        if id_map is None or not id_map.IsBound(shape):
+            raise KeyError("shape is not a face, edge or vertex of the shape")
+        return id_map.Find(shape)
+
+    def shape_from_id(self, topologyType, index):
+        """
+        returns the entity of topologyType numbered *index*, None if the
+        entity has been deleted or modified
+        """
+        return self._shapes[topologyType][index]
+
+    def ids(self, topologyType):
+        """returns the ids of the current topologyType entities"""
+        shapes = self._shapes[topologyType]
+        return [i for i, shp in enumerate(shapes) if shp is not None]
+
+    def _images(self, shapes):
+        """
+        numbers the entities of a TopTools_ListOfShape
+        :return: a ( topology type, id ) tuple per face, edge or vertex
+        """
+        images = []
+        topology_iterator = TopTools_ListIteratorOfListOfShape(shapes)
+        while topology_iterator.More():
+            shp = topology_iterator.Value()
+            if shp.ShapeType() in self._ids:
+                images.append((shp.ShapeType(), self._bind(shp)))
+            topology_iterator.Next()
+        return images
+
+    def update(self, builder):
+        """
+        replaces self.myShape by the result of a modeling operation, and
+        updates the ids from its history
+
+        :param builder: a BRepBuilderAPI_MakeShape ( BRepAlgoAPI_Cut,
+        BRepOffsetAPI_MakeOffsetShape ... ) or a ShapeFix_Shape, that
+        has been performed on self.myShape
+
+        :return: a dict that maps "face", "edge" and "vertex" to the dict
+        "deleted": ids of the deleted entities
+        "modified": old id -> ids of the entities that replace it
+        "generated": ids of the entities generated from other entities
+        the entities of the result without history, such as the faces a cut
+        takes from its tool, are numbered as well; ids() lists them
+
+        the ids and the entities of the unchanged faces, edges and vertices
+        are kept as they are, without being numbered again; the maps of the
+        shape are not updated incrementally though: a history does not list
+        the entities without history, so the result is explored once per
+        tracked type, in C++, and every entity it holds is looked up in the
+        ids; the ancestor maps and census are dropped, and rebuilt when
+        needed
+        """
+        if not hasattr(builder, "IsDeleted"):
+            builder = _ReShapeHistory(builder)
+        changes = dict(
+            (topo_lut[t], {"deleted": [], "modified": {}, "generated": set()})
+            for t in self._TRACKED
         )
-    else:
-        print(".." * level, end="")
-        print(shapeTypeString(shape))
-    it = TopoDS_Iterator(shape)
-    while it.More():
-        shp = it.Value()
-        it.Next()
-        dumpTopology(shp, level + 1)
-
-
-def shapeTypeString(shape):
-    st = shape.ShapeType()
-    s = "?"
-    if st == TopAbs_VERTEX:
-        s = "Vertex"
-    if st == TopAbs_SOLID:
-        s = "Solid"
-    if st == TopAbs_EDGE:
-        s = "Edge"
-    if st == TopAbs_FACE:
-        s = "Face"
-    if st == TopAbs_SHELL:
-        s = "Shell"
-    if st == TopAbs_WIRE:
-        s = "Wire"
-    if st == TopAbs_COMPOUND:
-        s = "Compound."
-    if st == TopAbs_COMPSOLID:
-        s = "Compsolid."
-    return "%s: %i" % (s, hash(shape))
+        n_ids = dict((t, len(self._shapes[t])) for t in self._TRACKED)
+        # the entities of the result are numbered from the history of the
+        # current entities, rather than by exploring the result
+        for topologyType in self._TRACKED:
+            change = changes[topo_lut[topologyType]]
+            current = [
+                (index, shp)
+                for index, shp in enumerate(self._shapes[topologyType])
+                if shp is not None
+            ]
+            for index, shp in current:
+                # the lists returned by the builder are only valid until
+                # its next call, they are consumed right away
+                for image_type, image in self._images(builder.Generated(shp)):
+                    changes[topo_lut[image_type]]["generated"].add(image)
+                if builder.IsDeleted(shp):
+                    self._retire(shp)
+                    change["deleted"].append(index)
+                    continue
+                images = [
+                    image
+                    for image_type, image in self._images(builder.Modified(shp))
+                    if image_type == topologyType and image != index
+                ]
+                if images:
+                    self._retire(shp)
+                    change["modified"][index] = images
+        self.myShape = builder.Shape()
+        self.invalidate()
+        # the result is explored to number the entities without history, and
+        # to retire the ids of the entities it does not contain
+        for topologyType in self._TRACKED:
+            change = changes[topo_lut[topologyType]]
+            absent = set()
+            for index in self._number_current(topologyType):
+                if index < n_ids[topologyType]:
+                    change["deleted"].append(index)
+                else:
+                    # an image given by the history, but not in the result
+                    absent.add(index)
+            for index, images in list(change["modified"].items()):
+                images = [image for image in images if image not in absent]
+                if images:
+                    change["modified"][index] = images
+                else:
+                    del change["modified"][index]
+                    change["deleted"].append(index)
+            change["deleted"].sort()
+            change["generated"] = sorted(change["generated"] - absent)
+        return changes
+
+
+def iter_topology(shape):
+    """
+    yields a record for every entity of *shape*, from the top down
+
+    every TShape + Location is described once: its sub-shapes are not
+    described again when it occurs in several parents, a record with "ref"
+    set to True is yielded for these later occurrences instead
+
+    locations and orientations are the ones stored in the parent, rather
+    than the ones accumulated from the top, the same way a TShape is stored
+    once in memory; the point of a vertex is in the frame of its parent
+
+    a record is a dict with the keys:
+    "id": number of the entity, in the order entities are described
+    "parent": id of the parent entity, None for *shape*
+    "level": depth of the entity, 0 for *shape*
+    "type": "vertex", "edge" ...
+    "orientation": "TopAbs_FORWARD", "TopAbs_REVERSED" ...
+    "ref": True when the entity has been described before
+    and for the first occurrence of an entity only:
+    "location": the 3 x 4 transformation matrix by rows, when not identity
+    "pnt": the x, y, z coordinates of a vertex
+    """
+    # entities are numbered in shape_map as they are met, and in ids as
+    # they are described
+    brt = BRep_Tool()
+    shape_map = TopTools_IndexedMapOfShape()
+    ids = {}
+    stack = [(shape_map.Add(shape), None, 0, shape.Orientation())]
+    while stack:
+        index, parent, level, orientation = stack.pop()
+        shp = shape_map.FindKey(index)
+        record = {
+            "parent": parent,
+            "level": level,
+            "type": topo_lut[shp.ShapeType()],
+            "orientation": orient_lut[orientation],
+        }
+        if index in ids:
+            record["id"] = ids[index]
+            record["ref"] = True
+            yield record
+            continue
+        record["id"] = ids[index] = len(ids)
+        record["ref"] = False
+        location = shp.Location()
+        if not location.IsIdentity():
+            trsf = location.Transformation()
+            record["location"] = [
+                trsf.Value(row, col) for row in (1, 2, 3) for col in (1, 2, 3, 4)
+            ]
+        if shp.ShapeType() == TopAbs_VERTEX:
+            pnt = brt.Pnt(topods_Vertex(shp))
+            record["pnt"] = [pnt.X(), pnt.Y(), pnt.Z()]
+        yield record
+        children = []
+        # neither orientations nor locations are accumulated
+        it = TopoDS_Iterator(shp, False, False)
+        while it.More():
+            child = it.Value()
+            children.append(
+                (shape_map.Add(child), record["id"], level + 1, child.Orientation())
+            )
+            it.Next()
+        # the first child goes on top of the stack
+        stack.extend(reversed(children))
+
+
+def dumpTopology(shape, level=0, stream=None):
+    """
+    Writes the details of an object from the top down, as one JSON
+    record per line, see iter_topology
+
+    :param level: depth of *shape*, added to the "level" of the records
+    :param stream: a file like object, sys.stdout by default
+    """
+    if stream is None:
+        stream = sys.stdout
+    for record in iter_topology(shape):
+        record["level"] += level
+        stream.write(json.dumps(record, sort_keys=True) + "\n")
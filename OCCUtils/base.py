@@ -38,11 +38,6 @@ Can be a module, class or namespace.
 import functools
 
 from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_Copy
-from OCC.Core.BRepGProp import (
-    brepgprop_VolumeProperties,
-    brepgprop_LinearProperties,
-    brepgprop_SurfaceProperties,
-)
 from OCC.Core.BRepCheck import (
     BRepCheck_Vertex,
     BRepCheck_Edge,
@@ -54,7 +49,7 @@ from OCC.Core.BRepCheck import (
 from OCC.Core.GProp import GProp_GProps
 from OCC.Display.SimpleGui import init_display
 
-from OCCUtils.Common import get_boundingbox
+from OCCUtils.Common import BoundingBoxCache, MassPropertiesCache, get_boundingbox
 from OCCUtils.Construct import make_vertex, TOLERANCE
 from OCCUtils.types_lut import shape_lut, topo_lut, curve_lut, surface_lut
 
@@ -208,19 +203,26 @@ class GlobalProperties(object):
 
     def __init__(self, instance):
         self.instance = instance
+        # keyed on the location of the instance, which can be moved
+        self._mass_properties = MassPropertiesCache()
+        self._bbox = BoundingBoxCache()
 
     @property
     def system(self):
-        self._system = GProp_GProps()
         # todo, type should be abstracted with TopoDS...
         _topo_type = self.instance.topo_type
         if _topo_type == "face" or _topo_type == "shell":
-            brepgprop_SurfaceProperties(self.instance, self._system)
+            kind = "surface"
         elif _topo_type == "edge":
-            brepgprop_LinearProperties(self.instance, self._system)
+            kind = "linear"
         elif _topo_type == "solid":
-            brepgprop_VolumeProperties(self.instance, self._system)
-        return self._system
+            kind = "volume"
+        else:
+            return GProp_GProps()
+        if self.instance.is_dirty:
+            # edited in place, the TShape and location did not change
+            self._mass_properties.clear()
+        return self._mass_properties.get(self.instance, kind, None).copy_gprops()
 
     def centre(self):
         """
@@ -240,4 +242,7 @@ class GlobalProperties(object):
         """
         returns the bounding box of the face
         """
-        return get_boundingbox(self.instance)
+        if self.instance.is_dirty:
+            # edited in place, the TShape and location did not change
+            self._bbox.clear()
+        return get_boundingbox(self.instance, cache=self._bbox)
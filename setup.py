@@ -32,6 +32,6 @@ setup(
     packages = ['OCCUtils'],
     keywords = 'pythonocc CAD',
     classifiers = CLASSIFIERS,
-    requires = ['OCC'],
+    requires = ['OCC', 'numpy'],
     package_data = { 'OCCUtils': ['README.md', 'doc/*.*', 'examples/*.*'], },
     )
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+##Copyright 2009-2015 Thomas Paviot (tpaviot@gmail.com)
+##
+##This file is part of pythonOCC.
+##
+##pythonOCC is free software: you can redistribute it and/or modify
+##it under the terms of the GNU Lesser General Public License as published by
+##the Free Software Foundation, either version 3 of the License, or
+##(at your option) any later version.
+##
+##pythonOCC is distributed in the hope that it will be useful,
+##but WITHOUT ANY WARRANTY; without even the implied warranty of
+##MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##GNU Lesser General Public License for more details.
+##
+##You should have received a copy of the GNU Lesser General Public License
+##along with pythonOCC.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+helpers shared by the benchmarks
+
+importing this module puts the OCCUtils modules on sys.path, so import it
+before them:
+
+>>> from benchmark_common import timed
+>>> from Topology import Topo
+"""
+
+import os
+import resource
+import sys
+import time
+
+_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(_root)
+sys.path.append(os.path.join(_root, "OCCUtils"))
+
+
+def timed(func, *args):
+    """returns the wall time of func(*args), and its result"""
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def max_rss_kb():
+    """
+    returns the peak resident memory of this process so far, in kilobytes
+    on linux; it is a high-water mark, that never goes down
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
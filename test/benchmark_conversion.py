@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+##Copyright 2009-2015 Thomas Paviot (tpaviot@gmail.com)
+##
+##This file is part of pythonOCC.
+##
+##pythonOCC is free software: you can redistribute it and/or modify
+##it under the terms of the GNU Lesser General Public License as published by
+##the Free Software Foundation, either version 3 of the License, or
+##(at your option) any later version.
+##
+##pythonOCC is distributed in the hope that it will be useful,
+##but WITHOUT ANY WARRANTY; without even the implied warranty of
+##MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##GNU Lesser General Public License for more details.
+##
+##You should have received a copy of the GNU Lesser General Public License
+##along with pythonOCC.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+compares the numpy to TColgp conversions of the Conversion module against
+the former per element SetValue loops, on curves of many points
+
+usage: python benchmark_conversion.py [number_of_points ...]
+"""
+
+import sys
+
+import numpy as np
+
+from OCC.Core.TColgp import TColgp_Array1OfPnt, TColgp_HArray1OfPnt
+from OCC.Core.gp import gp_Pnt
+
+from benchmark_common import timed
+from Conversion import from_numpy, to_numpy
+
+
+def legacy_to_tcol(points, collection_type):
+    """the former fix() helpers, fed with gp_Pnt built from the numpy rows"""
+    li = [gp_Pnt(p[0], p[1], p[2]) for p in points]
+    pts = collection_type(1, len(li))
+    for n, i in enumerate(li):
+        pts.SetValue(n + 1, i)
+    return pts
+
+
+def legacy_from_tcol(array):
+    return np.array(
+        [
+            [array.Value(i).X(), array.Value(i).Y(), array.Value(i).Z()]
+            for i in range(array.Lower(), array.Upper() + 1)
+        ]
+    )
+
+
+def run(n_points):
+    t = np.linspace(0.0, 10.0 * np.pi, n_points)
+    points = np.column_stack([np.cos(t), np.sin(t), t])
+    print("%i points" % n_points)
+    for collection_type in (TColgp_Array1OfPnt, TColgp_HArray1OfPnt):
+        legacy, legacy_array = timed(legacy_to_tcol, points, collection_type)
+        bulk, bulk_array = timed(from_numpy, points, collection_type)
+        print(
+            "  to %-20s legacy %8.4fs %6.2fus/pt  from_numpy %8.4fs %6.2fus/pt"
+            % (
+                collection_type.__name__,
+                legacy,
+                1e6 * legacy / n_points,
+                bulk,
+                1e6 * bulk / n_points,
+            )
+        )
+        legacy, legacy_points = timed(legacy_from_tcol, bulk_array)
+        bulk, bulk_points = timed(to_numpy, bulk_array)
+        assert np.array_equal(legacy_points, bulk_points)
+        print(
+            "  from %-18s legacy %8.4fs %6.2fus/pt  to_numpy   %8.4fs %6.2fus/pt"
+            % (
+                collection_type.__name__,
+                legacy,
+                1e6 * legacy / n_points,
+                bulk,
+                1e6 * bulk / n_points,
+            )
+        )
+
+
+if __name__ == "__main__":
+    sizes = [int(i) for i in sys.argv[1:]] or [1000, 10000, 100000]
+    for n in sizes:
+        run(n)
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+
+##Copyright 2009-2015 Thomas Paviot (tpaviot@gmail.com)
+##
+##This file is part of pythonOCC.
+##
+##pythonOCC is free software: you can redistribute it and/or modify
+##it under the terms of the GNU Lesser General Public License as published by
+##the Free Software Foundation, either version 3 of the License, or
+##(at your option) any later version.
+##
+##pythonOCC is distributed in the hope that it will be useful,
+##but WITHOUT ANY WARRANTY; without even the implied warranty of
+##MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##GNU Lesser General Public License for more details.
+##
+##You should have received a copy of the GNU Lesser General Public License
+##along with pythonOCC.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+benchmarks of the Topology, Iteration, Construct and Parallel hot paths
+on large synthetic inputs
+
+every case runs in a fresh process, which reports the best and mean
+wall time over the repeats, the peak of the memory allocated from python
+( tracemalloc ) during the repeats, and how much the peak resident memory
+of the process, OCC included, grew during the repeats above its peak
+after the untimed setup
+
+usage:
+    python benchmark_suite.py [--scale 1.0] [--repeat 3] [--output results.json]
+                              [--compare previous.json] [--only name ...]
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import platform
+import time
+import tracemalloc
+
+from OCC.Core.BRep import BRep_Builder
+from OCC.Core.BRepBuilderAPI import BRepBuilderAPI_MakeFace
+from OCC.Core.BRepPrimAPI import BRepPrimAPI_MakeSphere, BRepPrimAPI_MakeTorus
+from OCC.Core.TopoDS import TopoDS_Compound, TopoDS_Iterator
+from OCC.Core.gp import gp_Pnt, gp_Ax2, gp_Dir
+
+from benchmark_common import max_rss_kb
+from benchmark_topology import box_grid_compound, sewn_shell
+from Construct import make_edge, make_polygon, make_wire, sew_shapes
+from Iteration import EdgePairsFromWire, LoopWirePairs
+from Parallel import explore_compound
+from Topology import Topo, WireExplorer
+
+# ===========================================================================
+# synthetic inputs
+# ===========================================================================
+
+
+def polygon_points(n_points):
+    """points on a circle, that make a closed polygon with n_points edges"""
+    return [
+        gp_Pnt(
+            math.cos(2 * math.pi * i / n_points),
+            math.sin(2 * math.pi * i / n_points),
+            0.0,
+        )
+        for i in range(n_points)
+    ]
+
+
+def polygon_edges(n_points):
+    pnts = polygon_points(n_points)
+    return [make_edge(pnts[i - 1], pnts[i]) for i in range(n_points)]
+
+
+def sphere_torus_compound(n_shapes):
+    """a compound of n_shapes alternating spheres and tori"""
+    builder = BRep_Builder()
+    compound = TopoDS_Compound()
+    builder.MakeCompound(compound)
+    for i in range(n_shapes):
+        ax2 = gp_Ax2(gp_Pnt(3.0 * i, 0.0, 0.0), gp_Dir(0, 0, 1))
+        if i % 2:
+            shape = BRepPrimAPI_MakeTorus(ax2, 1.0, 0.3).Shape()
+        else:
+            shape = BRepPrimAPI_MakeSphere(ax2, 1.0).Shape()
+        builder.Add(compound, shape)
+    return compound
+
+
+def children_census(compound):
+    """the census of every child of *compound*, in this process"""
+    censuses = []
+    it = TopoDS_Iterator(compound)
+    while it.More():
+        censuses.append(Topo(it.Value()).census())
+        it.Next()
+    return censuses
+
+
+def square_faces(n_side):
+    """n_side x n_side unit squares, for sewing"""
+    faces = []
+    for i in range(n_side):
+        for j in range(n_side):
+            wire = make_polygon(
+                [
+                    gp_Pnt(i, j, 0.0),
+                    gp_Pnt(i + 1, j, 0.0),
+                    gp_Pnt(i + 1, j + 1, 0.0),
+                    gp_Pnt(i, j + 1, 0.0),
+                ],
+                closed=True,
+            )
+            faces.append(BRepBuilderAPI_MakeFace(wire).Face())
+    return faces
+
+
+# ===========================================================================
+# cases: name -> ( size, setup( size ), function( input ) )
+# the setup is not timed
+# ===========================================================================
+
+
+CASES = {
+    "topo_faces_box_grid": (
+        5000,
+        box_grid_compound,
+        lambda shape: list(Topo(shape).faces()),
+    ),
+    "topo_edges_box_grid": (
+        5000,
+        box_grid_compound,
+        lambda shape: list(Topo(shape).edges()),
+    ),
+    "topo_vertices_box_grid": (
+        5000,
+        box_grid_compound,
+        lambda shape: list(Topo(shape).vertices()),
+    ),
+    "topo_census_box_grid": (
+        5000,
+        box_grid_compound,
+        lambda shape: Topo(shape).census(),
+    ),
+    "topo_faces_from_edge_box_grid": (
+        1000,
+        box_grid_compound,
+        lambda shape: [
+            list(topo.faces_from_edge(e))
+            for topo in [Topo(shape)]
+            for e in topo.edges()
+        ],
+    ),
+    "topo_face_adjacency_box_grid": (
+        5000,
+        box_grid_compound,
+        lambda shape: Topo(shape).face_adjacency(),
+    ),
+    "topo_faces_sphere_torus": (
+        5000,
+        sphere_torus_compound,
+        lambda shape: list(Topo(shape).faces()),
+    ),
+    "topo_ignore_orientation_sewn_shell": (
+        100,
+        sewn_shell,
+        lambda shape: Topo(shape, ignore_orientation=True).edges(),
+    ),
+    "wire_explorer_polygon": (
+        20000,
+        lambda n: make_polygon(polygon_points(n), closed=True),
+        lambda wire: list(WireExplorer(wire).ordered_edges()),
+    ),
+    "edge_pairs_corners_polygon": (
+        20000,
+        lambda n: make_polygon(polygon_points(n), closed=True),
+        lambda wire: EdgePairsFromWire(wire).corners(),
+    ),
+    "loop_wire_pairs_polygon": (
+        2000,
+        lambda n: (
+            make_polygon(polygon_points(n), closed=True),
+            make_polygon(
+                [gp_Pnt(p.X(), p.Y(), 1.0) for p in polygon_points(n)], closed=True
+            ),
+        ),
+        lambda wires: list(LoopWirePairs(*wires)),
+    ),
+    # the same work, done in this process then in a pool of workers
+    "explore_compound_serial_box_grid": (5000, box_grid_compound, children_census),
+    "explore_compound_parallel_box_grid": (
+        5000,
+        box_grid_compound,
+        explore_compound,
+    ),
+    "make_wire_polygon": (5000, polygon_edges, make_wire),
+    "sew_shapes_squares": (50, square_faces, sew_shapes),
+}
+
+
+def _measure(name, scale, repeat, queue):
+    """runs a case, in its own process, and puts its results on queue"""
+    size, setup, function = CASES[name]
+    size = max(1, int(size * scale))
+    data = setup(size)
+    # ru_maxrss is a high-water mark, the one of the setup is subtracted
+    setup_rss = max_rss_kb()
+    times = []
+    tracemalloc.start()
+    for i in range(repeat):
+        start = time.perf_counter()
+        function(data)
+        times.append(time.perf_counter() - start)
+    peak_python = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    queue.put(
+        {
+            "name": name,
+            "size": size,
+            "repeat": repeat,
+            "best_seconds": min(times),
+            "mean_seconds": sum(times) / len(times),
+            "peak_python_kb": peak_python // 1024,
+            "setup_rss_kb": setup_rss,
+            "peak_rss_growth_kb": max_rss_kb() - setup_rss,
+        }
+    )
+
+
+def run(names, scale=1.0, repeat=3):
+    results = []
+    for name in names:
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=_measure, args=(name, scale, repeat, queue)
+        )
+        process.start()
+        result = queue.get()
+        process.join()
+        results.append(result)
+        print(
+            "%-40s %8i  best %9.4fs  mean %9.4fs  python %8i kB  rss +%8i kB"
+            % (
+                name,
+                result["size"],
+                result["best_seconds"],
+                result["mean_seconds"],
+                result["peak_python_kb"],
+                result["peak_rss_growth_kb"],
+            )
+        )
+    return results
+
+
+def environment():
+    try:
+        from OCC import VERSION as occ_version
+    except ImportError:
+        occ_version = "unknown"
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "pythonocc": occ_version,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results, previous):
+    """prints the ratio of the best times to the ones of a previous run"""
+    previous = dict((r["name"], r) for r in previous["results"])
+    for result in results:
+        old = previous.get(result["name"])
+        if old is None or old["size"] != result["size"]:
+            continue
+        speedup = old["best_seconds"] / result["best_seconds"]
+        print("%-40s x%.2f" % (result["name"], speedup))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="input sizes factor")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the results to this json file")
+    parser.add_argument("--compare", help="json file of a previous run")
+    parser.add_argument("--only", nargs="*", help="run these cases only")
+    args = parser.parse_args(argv)
+
+    names = sorted(CASES) if not args.only else args.only
+    results = run(names, args.scale, args.repeat)
+    report = {"environment": environment(), "scale": args.scale, "results": results}
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as previous:
+            compare(results, json.load(previous))
+    return report
+
+
+if __name__ == "__main__":
+    main()
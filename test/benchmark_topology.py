@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+
+##Copyright 2009-2015 Thomas Paviot (tpaviot@gmail.com)
+##
+##This file is part of pythonOCC.
+##
+##pythonOCC is free software: you can redistribute it and/or modify
+##it under the terms of the GNU Lesser General Public License as published by
+##the Free Software Foundation, either version 3 of the License, or
+##(at your option) any later version.
+##
+##pythonOCC is distributed in the hope that it will be useful,
+##but WITHOUT ANY WARRANTY; without even the implied warranty of
+##MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+##GNU Lesser General Public License for more details.
+##
+##You should have received a copy of the GNU Lesser General Public License
+##along with pythonOCC.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+compares the Topo traversal against the former list based deduplication
+on large synthetic compounds, and the ignore_orientation filtering against
+the former pairwise IsSame comparison on large sewn shells
+
+usage: python benchmark_topology.py [number_of_boxes ...]
+"""
+
+import sys
+
+from OCC.Core.BRep import BRep_Builder
+from OCC.Core.BRepBuilderAPI import (
+    BRepBuilderAPI_MakePolygon,
+    BRepBuilderAPI_MakeFace,
+    BRepBuilderAPI_Sewing,
+)
+from OCC.Core.BRepPrimAPI import BRepPrimAPI_MakeBox
+from OCC.Core.TopAbs import TopAbs_FACE, TopAbs_EDGE, TopAbs_VERTEX
+from OCC.Core.TopExp import TopExp_Explorer
+from OCC.Core.TopoDS import TopoDS_Compound
+from OCC.Core.gp import gp_Pnt
+
+from benchmark_common import timed
+from Topology import Topo
+
+
+def box_grid_compound(n_boxes):
+    """returns a compound of *n_boxes* disjoint boxes laid out on a grid"""
+    builder = BRep_Builder()
+    compound = TopoDS_Compound()
+    builder.MakeCompound(compound)
+    n_side = int(n_boxes ** 0.5) + 1
+    for i in range(n_boxes):
+        x, y = divmod(i, n_side)
+        box = BRepPrimAPI_MakeBox(gp_Pnt(x * 2.0, y * 2.0, 0.0), 1.0, 1.0, 1.0)
+        builder.Add(compound, box.Shape())
+    return compound
+
+
+def sewn_shell(n_side):
+    """returns the shell obtained by sewing *n_side* x *n_side* unit squares"""
+    sewing = BRepBuilderAPI_Sewing(1e-3)
+    for i in range(n_side):
+        for j in range(n_side):
+            poly = BRepBuilderAPI_MakePolygon(
+                gp_Pnt(i, j, 0.0),
+                gp_Pnt(i + 1, j, 0.0),
+                gp_Pnt(i + 1, j + 1, 0.0),
+                gp_Pnt(i, j + 1, 0.0),
+                True,
+            )
+            sewing.Add(BRepBuilderAPI_MakeFace(poly.Wire()).Face())
+    sewing.Perform()
+    return sewing.SewedShape()
+
+
+def legacy_loop_topo(shape, topologyType):
+    """the former Topo._loop_topo: a list of hashes is scanned for every
+    explored sub-shape"""
+    topExp = TopExp_Explorer()
+    topExp.Init(shape, topologyType)
+    seq = []
+    hashes = []
+    while topExp.More():
+        current_item = topExp.Current()
+        current_item_hash = current_item.__hash__()
+        if not current_item_hash in hashes:
+            hashes.append(current_item_hash)
+            seq.append(current_item)
+        topExp.Next()
+    return seq
+
+
+def legacy_ignore_orientation(shape, topologyType):
+    """the former ignore_orientation filtering: every entity is compared to
+    every entity kept so far"""
+    filter_orientation_seq = []
+    for i in legacy_loop_topo(shape, topologyType):
+        _present = False
+        for j in filter_orientation_seq:
+            if i.IsSame(j):
+                _present = True
+                break
+        if _present is False:
+            filter_orientation_seq.append(i)
+    return filter_orientation_seq
+
+
+def run(n_boxes):
+    compound = box_grid_compound(n_boxes)
+    topo = Topo(compound)
+    methods = (
+        ("faces", TopAbs_FACE, topo.faces),
+        ("edges", TopAbs_EDGE, topo.edges),
+        ("vertices", TopAbs_VERTEX, topo.vertices),
+    )
+    for name, topologyType, method in methods:
+        t_old, old = timed(legacy_loop_topo, compound, topologyType)
+        t_new, new = timed(lambda: list(method()))
+        assert len(old) == len(new), "results differ for %s" % name
+        print(
+            "%6i boxes %-8s %7i items   legacy %8.3fs   indexed map %8.3fs   x%.1f"
+            % (n_boxes, name, len(new), t_old, t_new, t_old / max(t_new, 1e-9))
+        )
+
+
+def run_ignore_orientation(n_faces):
+    shell = sewn_shell(int(n_faces ** 0.5))
+    topo = Topo(shell, ignore_orientation=True)
+    methods = (
+        ("faces", TopAbs_FACE, topo.faces),
+        ("edges", TopAbs_EDGE, topo.edges),
+    )
+    for name, topologyType, method in methods:
+        t_old, old = timed(legacy_ignore_orientation, shell, topologyType)
+        t_new, new = timed(method)
+        assert len(old) == len(new), "results differ for %s" % name
+        speedup = t_old / max(t_new, 1e-9)
+        print(
+            "%6i faces %-8s %7i items   pairwise IsSame %8.3fs   indexed map %8.3fs"
+            "   x%.1f" % (n_faces, name, len(new), t_old, t_new, speedup)
+        )
+
+
+if __name__ == "__main__":
+    sizes = [int(i) for i in sys.argv[1:]] or [100, 1000, 5000]
+    for n in sizes:
+        run(n)
+    for n in sizes:
+        run_ignore_orientation(n)
@@ -17,16 +17,78 @@
 ##You should have received a copy of the GNU Lesser General Public License
 ##along with pythonOCC.  If not, see <http://www.gnu.org/licenses/>.
 
+import io
+import json
 import unittest
 import sys
 
+import numpy as np
+
 sys.path.append('../')
 sys.path.append('../OCCUtils')
 
-from OCC.Core.BRepPrimAPI import BRepPrimAPI_MakeBox, BRepPrimAPI_MakeSphere
-from OCC.Core.TopoDS import TopoDS_Face, TopoDS_Edge
-
-from Topology import Topo, WireExplorer
+from OCC.Core.BRep import BRep_Builder
+from OCC.Core.BRepAlgoAPI import BRepAlgoAPI_Cut
+from OCC.Core.BRepBuilderAPI import (
+    BRepBuilderAPI_MakeEdge,
+    BRepBuilderAPI_MakeFace,
+    BRepBuilderAPI_Transform,
+)
+from OCC.Core.BRepGProp import brepgprop_VolumeProperties
+from OCC.Core.BRepMesh import BRepMesh_IncrementalMesh
+from OCC.Core.BRepPrimAPI import (
+    BRepPrimAPI_MakeBox,
+    BRepPrimAPI_MakePrism,
+    BRepPrimAPI_MakeSphere,
+    BRepPrimAPI_MakeWedge,
+)
+from OCC.Core.TopAbs import (
+    TopAbs_IN,
+    TopAbs_OUT,
+    TopAbs_ON,
+    TopAbs_VERTEX,
+    TopAbs_EDGE,
+    TopAbs_WIRE,
+    TopAbs_FACE,
+    TopAbs_SOLID,
+)
+from OCC.Core.Geom import Geom_Line
+from OCC.Core.GProp import GProp_GProps
+from OCC.Core.TColgp import (
+    TColgp_Array1OfPnt,
+    TColgp_HArray1OfPnt,
+    TColgp_Array1OfPnt2d,
+    TColgp_Array2OfPnt,
+)
+from OCC.Core.TColStd import TColStd_HArray1OfBoolean, TColStd_Array1OfReal
+from OCC.Core.TopLoc import TopLoc_Location
+from OCC.Core.TopoDS import TopoDS_Face, TopoDS_Edge, TopoDS_Compound
+from OCC.Core.gp import gp_Trsf, gp_Ax1, gp_Pnt, gp_Dir, gp_Vec
+
+from Topology import Topo, IncrementalTopo, WireExplorer, dumpTopology
+from Graph import TopologyGraph
+from Parallel import shape_to_string, shape_from_string, explore_compound
+from Fingerprint import shape_fingerprint
+from Select import select
+from SpatialIndex import BoundingVolumeHierarchy
+from Common import (
+    BoundingBoxCache,
+    GpropsFromShape,
+    MassPropertiesCache,
+    cast_rays,
+    classify_points,
+    filter_points_by_distance,
+    get_boundingbox,
+    get_boundingboxes,
+    get_mass_properties,
+    interpolate_curves,
+    mass_properties,
+    minimum_distances,
+    point_in_solid,
+)
+from Construct import make_polygon
+from Conversion import bspline_from_numpy, from_numpy, to_numpy
+from Iteration import EdgePairsFromWire, LoopWirePairs
 from edge import Edge
 from face import Face
 from wire import Wire
@@ -43,6 +105,15 @@ def get_test_sphere_shape():
     return BRepPrimAPI_MakeSphere(10.).Shape()
 
 
+def get_test_compound_shape(*shapes):
+    builder = BRep_Builder()
+    compound = TopoDS_Compound()
+    builder.MakeCompound(compound)
+    for shape in shapes:
+        builder.Add(compound, shape)
+    return compound
+
+
 class TestTopo(unittest.TestCase):
     def setUp(self):
         self.topo = Topo(get_test_box_shape())
@@ -72,6 +143,58 @@ class TestTopo(unittest.TestCase):
         assert(self.topo.number_of_compounds() == 0)
         assert(self.topo.number_of_comp_solids() == 0)
 
+    def test_loop_shared_entities(self):
+        '''sub-shapes shared by several parents are returned once'''
+        box = get_test_box_shape()
+        topo = Topo(get_test_compound_shape(box, box))
+        self.assertEqual(len(list(topo.faces())), 6)
+        self.assertEqual(len(list(topo.edges())), 12)
+        self.assertEqual(len(list(topo.vertices())), 8)
+        # same through the explorer path that skips a topology type
+        edges = list(topo._loop_topo(TopAbs_EDGE, None, TopAbs_FACE))
+        self.assertEqual(len(edges), 0)
+
+    def test_lazy_traversal(self):
+        '''lazy traversals are generators returning the same entities'''
+        topo = Topo(get_test_box_shape(), lazy=True)
+        faces = topo.faces()
+        self.assertFalse(isinstance(faces, list))
+        self.assertTrue(isinstance(next(faces), TopoDS_Face))
+        self.assertEqual(len(list(faces)), 5)
+        n_edges = 0
+        for f in topo.faces():
+            for e in topo.edges():
+                n_edges += 1
+        self.assertEqual(n_edges, 6 * 12)
+        self.assertEqual(topo.number_of_vertices(), 8)
+
+    def test_ignore_orientation(self):
+        '''ignore_orientation returns the entities once, as a list'''
+        topo = Topo(get_test_box_shape(), ignore_orientation=True)
+        self.assertEqual(len(topo.faces()), 6)
+        self.assertEqual(len(topo.edges()), 12)
+        self.assertEqual(len(topo.vertices()), 8)
+        edg = topo.edges()[0]
+        self.assertEqual(len(list(topo.faces_from_edge(edg))), 2)
+        self.assertEqual(len(list(topo.edges_from_vertex(topo.vertices()[0]))), 3)
+
+    def test_census(self):
+        '''census counts unique entities and occurrences in one walk'''
+        census = self.topo.census()
+        self.assertEqual(census['face'], (6, 6))
+        self.assertEqual(census['wire'], (6, 6))
+        self.assertEqual(census['edge'], (12, 24))
+        self.assertEqual(census['vertex'], (8, 48))
+        self.assertEqual(census['shell'], (1, 1))
+        self.assertEqual(census['solid'], (1, 1))
+        self.assertEqual(census['compound'], (0, 0))
+        self.assertEqual(census['compsolid'], (0, 0))
+        self.assertEqual(self.topo.number_of_edges(), len(list(self.topo.edges())))
+        box = get_test_box_shape()
+        census = Topo(get_test_compound_shape(box, box)).census()
+        self.assertEqual(census['compound'], (1, 1))
+        self.assertEqual(census['face'], (6, 12))
+
     def test_nested_iteration(self):
         '''check nested looping'''
         for f in self.topo.faces():
@@ -98,6 +221,29 @@ class TestTopo(unittest.TestCase):
         edges_from_face = [i for i in self.topo.edges_from_face(face)]
         self.assertTrue(len(edges_from_face) == self.topo.number_of_edges_from_face(face))
 
+    def test_ancestor_map_cache(self):
+        '''ancestor maps are built once and dropped by invalidate'''
+        edges = list(self.topo.edges())
+        for edg in edges:
+            self.assertEqual(self.topo.number_of_faces_from_edge(edg), 2)
+            self.assertEqual(len(list(self.topo.faces_from_edge(edg))), 2)
+        self.assertEqual(list(self.topo._ancestor_maps), [(TopAbs_EDGE, TopAbs_FACE)])
+        self.topo.invalidate()
+        self.assertEqual(len(self.topo._ancestor_maps), 0)
+        self.assertEqual(self.topo.number_of_faces_from_edge(edges[0]), 2)
+
+    def test_face_adjacency(self):
+        '''every edge of a box is shared by exactly two faces'''
+        adjacency, valence = self.topo.face_adjacency()
+        self.assertEqual(adjacency.shape, (12, 3))
+        self.assertEqual(list(valence), [2] * 12)
+        self.assertTrue((adjacency[:, 0] < adjacency[:, 1]).all())
+        faces, edges = list(self.topo.faces()), list(self.topo.edges())
+        for face_i, face_j, edge_id in adjacency:
+            neighbors = list(self.topo.faces_from_edge(edges[edge_id]))
+            self.assertTrue(any(faces[face_i].IsSame(f) for f in neighbors))
+            self.assertTrue(any(faces[face_j].IsSame(f) for f in neighbors))
+
     def test_edge_wire(self):
         edg = next(self.topo.edges())
         wire = next(self.topo.wires())
@@ -160,6 +306,520 @@ class TestTopo(unittest.TestCase):
         for v in _vertices:
             assert not v.IsNull()
 
+    def test_wire_explorer_cache(self):
+        '''a wire is walked once, its edges and vertices can be reused'''
+        wire = next(self.topo.wires())
+        explorer = WireExplorer(wire)
+        self.assertEqual(len(explorer), 4)
+        self.assertTrue(isinstance(explorer.edges, tuple))
+        self.assertEqual(len(explorer.vertices), 4)
+        self.assertEqual(len(list(explorer.ordered_edges())), 4)
+        self.assertEqual(len(list(explorer.ordered_edges())), 4)
+        self.assertEqual(self.topo.number_of_ordered_edges_from_wire(wire), 4)
+        self.assertTrue(
+            self.topo._wire_explorer(wire) is self.topo._wire_explorer(wire)
+        )
+
+    def test_dump_topology(self):
+        '''shared entities are described once, and referenced afterwards'''
+        stream = io.StringIO()
+        dumpTopology(get_test_box_shape(), stream=stream)
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        described = [r for r in records if not r['ref']]
+        self.assertEqual(len(records), 62)
+        self.assertEqual(len(described), 34)
+        self.assertEqual([r['id'] for r in described], list(range(34)))
+        self.assertEqual(records[0]['type'], 'solid')
+        self.assertEqual(len([r for r in described if r['type'] == 'vertex']), 8)
+        self.assertTrue(all('pnt' in r for r in described if r['type'] == 'vertex'))
+        stream = io.StringIO()
+        dumpTopology(get_test_box_shape(), 2, stream=stream)
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(records[0]['level'], 2)
+
+
+class TestIncrementalTopo(unittest.TestCase):
+    def test_update_from_history(self):
+        box = get_test_box_shape()
+        topo = IncrementalTopo(box)
+        self.assertEqual(topo.ids(TopAbs_FACE), list(range(6)))
+        faces = list(topo.faces())
+        entries = dict((t, [topo.shape_from_id(t, i) for i in topo.ids(t)])
+                       for t in (TopAbs_FACE, TopAbs_EDGE, TopAbs_VERTEX))
+        tool = BRepPrimAPI_MakeBox(gp_Pnt(5, 10, 15), 10, 20, 30).Shape()
+        cut = BRepAlgoAPI_Cut(box, tool)
+        changes = topo.update(cut)
+        # the faces x = 10, y = 20 and z = 30 are cut, the others are kept
+        self.assertEqual(len(changes['face']['modified']), 3)
+        self.assertEqual(changes['face']['deleted'], [])
+        # the faces of the tool, that have no history, are numbered as well
+        self.assertEqual(topo.number_of_faces(), 9)
+        self.assertEqual(len(topo.ids(TopAbs_FACE)), 9)
+        self.assertEqual(len(topo.ids(TopAbs_EDGE)), topo.number_of_edges())
+        self.assertEqual(len(topo.ids(TopAbs_VERTEX)), topo.number_of_vertices())
+        # the entries of the untouched entities are reused, not renumbered
+        for topologyType, before in entries.items():
+            change = changes[{TopAbs_FACE: 'face', TopAbs_EDGE: 'edge',
+                              TopAbs_VERTEX: 'vertex'}[topologyType]]
+            for index, entity in enumerate(before):
+                if index in change['modified'] or index in change['deleted']:
+                    continue
+                self.assertIs(topo.shape_from_id(topologyType, index), entity)
+        for index, face in enumerate(faces):
+            if index in changes['face']['modified']:
+                self.assertTrue(topo.shape_from_id(TopAbs_FACE, index) is None)
+            else:
+                self.assertTrue(topo.shape_from_id(TopAbs_FACE, index).IsSame(face))
+                self.assertEqual(topo.id_from_shape(face), index)
+        ids = []
+        for face in topo.faces():
+            index = topo.id_from_shape(face)
+            self.assertTrue(topo.shape_from_id(TopAbs_FACE, index).IsSame(face))
+            ids.append(index)
+        self.assertEqual(sorted(ids), topo.ids(TopAbs_FACE))
+
+    def test_id_from_shape_does_not_bind(self):
+        topo = IncrementalTopo(get_test_box_shape())
+        other = BRepPrimAPI_MakeBox(1, 1, 1).Shape()
+        for face in Topo(other).faces():
+            self.assertRaises(KeyError, topo.id_from_shape, face)
+        self.assertRaises(KeyError, topo.id_from_shape, other)
+        self.assertEqual(topo.ids(TopAbs_FACE), list(range(6)))
+
+
+class TestTopologyGraph(unittest.TestCase):
+    def setUp(self):
+        self.shape = get_test_box_shape()
+        self.graph = TopologyGraph(self.shape)
+
+    def test_number_of(self):
+        self.assertEqual(self.graph.number_of(TopAbs_SOLID), 1)
+        self.assertEqual(self.graph.number_of(TopAbs_FACE), 6)
+        self.assertEqual(self.graph.number_of(TopAbs_EDGE), 12)
+        self.assertEqual(self.graph.number_of(TopAbs_VERTEX), 8)
+
+    def test_incidence(self):
+        indptr, indices = self.graph.incidence(TopAbs_FACE, TopAbs_EDGE)
+        self.assertEqual(list(indptr), [0, 4, 8, 12, 16, 20, 24])
+        for edge_id in range(12):
+            faces = self.graph.neighbors(TopAbs_EDGE, edge_id, TopAbs_FACE)
+            self.assertEqual(len(faces), 2)
+        for vertex_id in range(8):
+            edges = self.graph.neighbors(TopAbs_VERTEX, vertex_id, TopAbs_EDGE)
+            self.assertEqual(len(edges), 3)
+        self.assertEqual(len(self.graph.neighbors(TopAbs_SOLID, 0, TopAbs_VERTEX)), 8)
+        self.assertEqual(len(self.graph.neighbors(TopAbs_FACE, 0, TopAbs_WIRE)), 1)
+
+    def test_ids(self):
+        topo = Topo(self.shape)
+        for i, face in enumerate(topo.faces()):
+            self.assertEqual(self.graph.id_from_shape(face), i)
+            self.assertTrue(self.graph.shape_from_id(TopAbs_FACE, i).IsSame(face))
+        edg = next(topo.edges())
+        faces = [self.graph.shape_from_id(TopAbs_FACE, i) for i in
+                 self.graph.neighbors(TopAbs_EDGE, 0, TopAbs_FACE)]
+        for face in topo.faces_from_edge(edg):
+            self.assertTrue(any(face.IsSame(f) for f in faces))
+
+
+class TestParallel(unittest.TestCase):
+    def test_shape_string(self):
+        box = get_test_box_shape()
+        face = next(Topo(box).faces()).Reversed()
+        copy = shape_from_string(shape_to_string(face))
+        self.assertTrue(isinstance(copy, TopoDS_Face))
+        self.assertEqual(copy.Orientation(), face.Orientation())
+        self.assertEqual(Topo(copy).number_of_edges(), 4)
+
+    def test_explore_compound(self):
+        box = get_test_box_shape()
+        sphere = get_test_sphere_shape()
+        compound = get_test_compound_shape(box, sphere)
+        exploration = explore_compound(compound, processes=2)
+        self.assertEqual(exploration.counts('face'), [6, 1])
+        self.assertEqual(exploration.number_of('face'), 7)
+        self.assertEqual(exploration.locate('face', 6), (1, 0))
+        sphere_face = exploration.shape_from_id('face', 6)
+        self.assertTrue(sphere_face.IsSame(next(Topo(sphere).faces())))
+        self.assertEqual(exploration.id_from_shape(1, sphere_face), 6)
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_placement_independent(self):
+        box = get_test_box_shape()
+        trsf = gp_Trsf()
+        trsf.SetRotation(gp_Ax1(gp_Pnt(1, 2, 3), gp_Dir(1, 1, 0)), 0.7)
+        trsf.SetTranslationPart(gp_Vec(100, -50, 20))
+        moved = BRepBuilderAPI_Transform(box, trsf, True).Shape()
+        self.assertEqual(shape_fingerprint(box), shape_fingerprint(moved))
+        other = BRepPrimAPI_MakeBox(10, 20, 31).Shape()
+        self.assertNotEqual(shape_fingerprint(box), shape_fingerprint(other))
+        self.assertNotEqual(shape_fingerprint(box),
+                            shape_fingerprint(get_test_sphere_shape()))
+
+    def test_placement_independent_polyhedral(self):
+        # an L bracket and a wedge, whose oriented boxes are not found from
+        # the world axes once rotated
+        profile = make_polygon([gp_Pnt(0, 0, 0), gp_Pnt(40, 0, 0),
+                                gp_Pnt(40, 6, 0), gp_Pnt(6, 6, 0),
+                                gp_Pnt(6, 25, 0), gp_Pnt(0, 25, 0)], closed=True)
+        bracket = BRepPrimAPI_MakePrism(BRepBuilderAPI_MakeFace(profile).Face(),
+                                        gp_Vec(0, 0, 15)).Shape()
+        wedge = BRepPrimAPI_MakeWedge(10., 20., 30., 4.).Shape()
+        trsf = gp_Trsf()
+        trsf.SetRotation(gp_Ax1(gp_Pnt(3, -2, 7), gp_Dir(0.3, -0.8, 0.5)), 0.4137)
+        trsf.SetTranslationPart(gp_Vec(-12, 31, 5))
+        for shape in (bracket, wedge):
+            moved = BRepBuilderAPI_Transform(shape, trsf, True).Shape()
+            self.assertEqual(shape_fingerprint(shape), shape_fingerprint(moved))
+
+    def test_meshing_independent(self):
+        for shape in (BRepPrimAPI_MakeBox(10, 20, 30).Shape(),
+                      BRepPrimAPI_MakeSphere(gp_Pnt(1, 2, 3), 7.).Shape()):
+            before = shape_fingerprint(shape)
+            BRepMesh_IncrementalMesh(shape, 0.5)
+            self.assertEqual(before, shape_fingerprint(shape))
+
+
+class TestSelect(unittest.TestCase):
+    def test_select_faces(self):
+        box = get_test_box_shape()
+        selection = select(box)
+        faces = selection.faces()
+        self.assertEqual(len(faces.where(type='plane')), 6)
+        self.assertEqual(len(faces.where(type='cylinder')), 0)
+        # the box faces have areas of 200, 300 and 600
+        self.assertEqual(len(faces.where(area_gt=250.)), 4)
+        self.assertEqual(len(faces.where(area_gt=250., area_lt=500.)), 2)
+        self.assertEqual(len(faces.where(normal_parallel_to=(0, 0, 1))), 2)
+        selected = faces.where(type='plane', area_gt=250., normal_parallel_to=gp_Dir(1, 0, 0))
+        self.assertEqual(len(selected), 2)
+        self.assertTrue(all(isinstance(f, TopoDS_Face) for f in selected))
+        # the property table is reused
+        self.assertTrue(selection.faces() is faces)
+
+    def test_select_non_planar(self):
+        faces = select(get_test_sphere_shape()).faces()
+        self.assertEqual(len(faces.where(type='sphere')), 1)
+        self.assertEqual(len(faces.where(normal_parallel_to=(0, 0, 1))), 0)
+
+
+class TestBoundingBox(unittest.TestCase):
+    def test_boundingboxes(self):
+        box = get_test_box_shape()
+        boxes = get_boundingboxes(box, TopAbs_FACE)
+        self.assertEqual(boxes.shape, (6, 6))
+        faces = list(Topo(box).faces())
+        for face, row in zip(faces, boxes):
+            self.assertEqual(tuple(row), get_boundingbox(face))
+        self.assertEqual(get_boundingboxes(faces).tolist(), boxes.tolist())
+
+    def test_boundingbox_cache(self):
+        cache = BoundingBoxCache()
+        box = get_test_box_shape()
+        get_boundingboxes(box, TopAbs_FACE, cache=cache)
+        self.assertEqual(len(cache), 6)
+        get_boundingboxes(box, TopAbs_FACE, cache=cache)
+        get_boundingbox(box.Reversed(), cache=cache)
+        self.assertEqual(len(cache), 7)
+        # a moved copy has a box of its own
+        trsf = gp_Trsf()
+        trsf.SetTranslation(gp_Vec(100, 0, 0))
+        moved = box.Moved(TopLoc_Location(trsf))
+        xmin = get_boundingbox(moved, cache=cache)[0]
+        self.assertEqual(len(cache), 8)
+        self.assertAlmostEqual(xmin, 100.0, 4)
+        # the optimal boxes are kept apart from the others
+        get_boundingbox(box, optimal=True, cache=cache)
+        self.assertEqual(len(cache), 9)
+
+
+class TestConversion(unittest.TestCase):
+    def test_points(self):
+        points = np.array([[0.0, 1.0, 2.0], [3.0, 4.0, 5.0], [6.0, 7.0, 8.0]])
+        for collection_type in (TColgp_Array1OfPnt, TColgp_HArray1OfPnt):
+            array = from_numpy(points, collection_type)
+            self.assertEqual((array.Lower(), array.Upper()), (1, 3))
+            self.assertEqual(array.Value(2).Coord(), (3.0, 4.0, 5.0))
+            self.assertEqual(to_numpy(array).tolist(), points.tolist())
+        pnts = [gp_Pnt(*point) for point in points]
+        array = from_numpy(pnts, TColgp_Array1OfPnt)
+        self.assertEqual(to_numpy(array).tolist(), points.tolist())
+        array = from_numpy(points[:, :2], TColgp_Array1OfPnt2d)
+        self.assertEqual(to_numpy(array).tolist(), points[:, :2].tolist())
+
+    def test_scalars(self):
+        mask = from_numpy([True, False, True], TColStd_HArray1OfBoolean)
+        self.assertEqual(to_numpy(mask).tolist(), [True, False, True])
+        knots = from_numpy(np.array([0.0, 0.5, 1.0]), TColStd_Array1OfReal)
+        self.assertEqual(to_numpy(knots).tolist(), [0.0, 0.5, 1.0])
+
+    def test_grid(self):
+        poles = np.arange(2 * 3 * 3, dtype=float).reshape(2, 3, 3)
+        grid = from_numpy(poles, TColgp_Array2OfPnt)
+        self.assertEqual((grid.ColLength(), grid.RowLength()), (2, 3))
+        self.assertEqual(grid.Value(2, 1).Coord(), (9.0, 10.0, 11.0))
+        self.assertEqual(to_numpy(grid).tolist(), poles.tolist())
+
+
+class TestInterpolateCurves(unittest.TestCase):
+    def setUp(self):
+        t = np.linspace(0.0, np.pi, 10)
+        arc = np.column_stack([np.cos(t), np.sin(t), np.zeros_like(t)])
+        # the last one cannot be interpolated, its points are the same
+        self.point_arrays = [arc, arc * 2.0, np.zeros((5, 3))]
+        tangents = np.full(arc.shape, np.nan)
+        tangents[0] = 0.0, 1.0, 0.0
+        self.tangents = [None, tangents, None]
+
+    def check_fits(self, fits):
+        self.assertEqual([fit.index for fit in fits], [0, 1, 2])
+        self.assertEqual([fit.ok for fit in fits], [True, True, False])
+        self.assertTrue(fits[2].error)
+        end = fits[1].curve.Value(fits[1].curve.LastParameter())
+        self.assertAlmostEqual(end.X(), -2.0)
+
+    def test_interpolate_curves(self):
+        self.check_fits(interpolate_curves(self.point_arrays, self.tangents))
+
+    def test_interpolate_curves_parallel(self):
+        fits = interpolate_curves(
+            self.point_arrays, self.tangents, parallel=True, processes=2, chunksize=1
+        )
+        self.check_fits(fits)
+
+    def test_approximate_as_arrays(self):
+        fits = interpolate_curves(
+            self.point_arrays[:2], approximate=True, as_arrays=True
+        )
+        self.assertIsNone(fits[0].curve)
+        self.assertEqual(fits[0].arrays["poles"].shape[1], 3)
+        curve = bspline_from_numpy(fits[0].arrays)
+        self.assertAlmostEqual(curve.Value(curve.FirstParameter()).X(), 1.0)
+
+
+class TestFilterPoints(unittest.TestCase):
+    def test_filter_points_by_distance(self):
+        coords = [(0, 0, 0), (0.05, 0, 0), (1, 0, 0), (1, 0.09, 0), (2, 0, 0)]
+        pnts = [gp_Pnt(*coord) for coord in coords]
+        kept = filter_points_by_distance(pnts, 0.1)
+        self.assertEqual([pnt.X() for pnt in kept], [0.0, 1.0, 2.0])
+        kept = filter_points_by_distance(np.array(coords, dtype=float), 0.1)
+        self.assertEqual(kept[:, 0].tolist(), [0.0, 1.0, 2.0])
+
+    def test_filter_points_against_kept_points(self):
+        # ( 0.16, 0, 0 ) is close to the dropped point, not to a kept one
+        coords = np.array([(0, 0, 0), (0.08, 0, 0), (0.16, 0, 0)], dtype=float)
+        kept = filter_points_by_distance(coords, 0.1)
+        self.assertEqual(kept[:, 0].tolist(), [0.0, 0.16])
+
+    def test_filter_points_negative_distance(self):
+        coords = np.array([(0, 0, 0), (0, 0, 0), (0.05, 0, 0)], dtype=float)
+        self.assertEqual(len(filter_points_by_distance(coords, -0.1)), 3)
+        self.assertEqual(len(filter_points_by_distance(coords, 0.)), 2)
+
+    def test_filter_points_large_extent(self):
+        # 2e9 cells along each axis, more than an int64 cell number can hold
+        coords = np.array(
+            [(0, 0, 0), (2e6, 2e6, 2e6), (2e6 + 5e-4, 2e6, 2e6), (1e6, 0, 2e6)]
+        )
+        kept = filter_points_by_distance(coords, 1e-3)
+        self.assertEqual(kept.tolist(), coords[[0, 1, 3]].tolist())
+
+
+class TestMassProperties(unittest.TestCase):
+    def test_mass_properties(self):
+        props = mass_properties(get_test_box_shape())
+        self.assertAlmostEqual(props.mass, 6000.0)
+        for coord, expected in zip(props.centre, (5.0, 10.0, 15.0)):
+            self.assertAlmostEqual(coord, expected)
+        # ixx of a 10 x 20 x 30 box about its centre
+        self.assertAlmostEqual(props.inertia[0][0], 6000.0 * (20 ** 2 + 30 ** 2) / 12)
+        self.assertEqual(len(props.moments), 3)
+
+    def test_mass_properties_cache(self):
+        cache = MassPropertiesCache()
+        box = get_test_box_shape()
+        props = mass_properties(box, cache=cache)
+        self.assertIs(mass_properties(box, cache=cache), props)
+        self.assertIsNot(mass_properties(box, tolerance=1e-3, cache=cache), props)
+        self.assertIsNot(mass_properties(box, "surface", cache=cache), props)
+        self.assertEqual(len(cache), 3)
+        # the integration is cached, the properties returned are copies
+        gprops = GpropsFromShape(box)
+        volume = gprops.volume()
+        volume.Add(gprops.volume())
+        self.assertAlmostEqual(volume.Mass(), 12000.0)
+        self.assertAlmostEqual(gprops.volume().Mass(), 6000.0)
+        self.assertAlmostEqual(props.copy_gprops().Mass(), 6000.0)
+
+    def test_copy_gprops_of_moved_shape(self):
+        trsf = gp_Trsf()
+        trsf.SetRotation(gp_Ax1(gp_Pnt(1, 2, 3), gp_Dir(1, 1, 0)), 0.7)
+        trsf.SetTranslationPart(gp_Vec(100, -50, 20))
+        moved = BRepBuilderAPI_Transform(get_test_box_shape(), trsf, False).Shape()
+        copy = mass_properties(moved).copy_gprops()
+        fresh = GProp_GProps()
+        brepgprop_VolumeProperties(moved, fresh)
+        self.assertAlmostEqual(copy.Mass(), fresh.Mass())
+        self.assertTrue(copy.CentreOfMass().IsEqual(fresh.CentreOfMass(), 1e-9))
+        for i in (1, 2, 3):
+            for j in (1, 2, 3):
+                self.assertAlmostEqual(copy.MatrixOfInertia().Value(i, j),
+                                       fresh.MatrixOfInertia().Value(i, j),
+                                       places=6)
+
+    def test_get_mass_properties(self):
+        arrays = get_mass_properties(get_test_box_shape(), TopAbs_FACE)
+        self.assertEqual(arrays["mass"].shape, (6,))
+        self.assertEqual(arrays["inertia"].shape, (6, 3, 3))
+        self.assertAlmostEqual(arrays["mass"].sum(), 2 * (200 + 300 + 600))
+
+
+class TestClassifyPoints(unittest.TestCase):
+    def setUp(self):
+        self.solid = get_test_box_shape()
+        # inside, outside the bounding box, on a face
+        self.points = [(5, 10, 15), (50, 0, 0), (0, 10, 15)]
+        self.expected = [TopAbs_IN, TopAbs_OUT, TopAbs_ON]
+
+    def test_classify_points(self):
+        states = classify_points(self.solid, self.points)
+        self.assertEqual(states.tolist(), self.expected)
+        pnts = [gp_Pnt(*point) for point in self.points]
+        self.assertEqual(classify_points(self.solid, pnts).tolist(), self.expected)
+        self.assertEqual(point_in_solid(self.solid, pnts[0]), (True, "in"))
+
+    def test_classify_points_parallel(self):
+        states = classify_points(self.solid, self.points, parallel=True, processes=2)
+        self.assertEqual(states.tolist(), self.expected)
+
+
+class TestCastRays(unittest.TestCase):
+    def setUp(self):
+        self.box = get_test_box_shape()
+        # two rays through the box along x, one that misses it
+        self.origins = [(-5, 10, 15), (-5, 5, 5), (-5, 50, 50)]
+
+    def test_nearest_hits(self):
+        hits = cast_rays(self.box, self.origins, gp_Dir(1, 0, 0))
+        self.assertEqual(hits["ray"].tolist(), [0, 1])
+        for x, w in zip(hits["point"][:, 0], hits["w"]):
+            self.assertAlmostEqual(x, 0.0)
+            self.assertAlmostEqual(w, 5.0)
+        faces = list(Topo(self.box).faces())
+        for face_id in hits["face"]:
+            self.assertAlmostEqual(get_boundingbox(faces[face_id])[0], 0.0, 4)
+
+    def test_all_hits(self):
+        hits = cast_rays(self.box, self.origins, (1, 0, 0), nearest=False)
+        self.assertEqual(hits["ray"].tolist(), [0, 0, 1, 1])
+        for w, expected in zip(hits["w"], [5.0, 15.0, 5.0, 15.0]):
+            self.assertAlmostEqual(w, expected)
+
+    def test_parallel(self):
+        hits = cast_rays(self.box, self.origins, (1, 0, 0), nearest=False)
+        parallel_hits = cast_rays(
+            self.box,
+            self.origins,
+            (1, 0, 0),
+            nearest=False,
+            parallel=True,
+            processes=2,
+            chunksize=1,
+        )
+        self.assertEqual(parallel_hits.tolist(), hits.tolist())
+
+
+class TestMinimumDistances(unittest.TestCase):
+    def setUp(self):
+        # boxes 25 and 90 apart along x
+        self.shapes = [
+            BRepPrimAPI_MakeBox(gp_Pnt(x, 0, 0), 10, 20, 30).Shape()
+            for x in (0, 35, 135)
+        ]
+
+    def test_minimum_distances(self):
+        distances = minimum_distances(self.shapes, 30.0)
+        self.assertEqual(len(distances), 1)
+        self.assertEqual((distances["i"][0], distances["j"][0]), (0, 1))
+        self.assertAlmostEqual(distances["distance"][0], 25.0)
+        self.assertAlmostEqual(distances["point_i"][0][0], 10.0)
+        self.assertAlmostEqual(distances["point_j"][0][0], 35.0)
+        self.assertEqual(len(minimum_distances(self.shapes, 20.0)), 0)
+
+    def test_minimum_distances_parallel(self):
+        distances = minimum_distances(
+            self.shapes, 100.0, parallel=True, processes=2, chunksize=1
+        )
+        pairs = list(zip(distances["i"].tolist(), distances["j"].tolist()))
+        self.assertEqual(pairs, [(0, 1), (1, 2)])
+
+
+class TestBoundingVolumeHierarchy(unittest.TestCase):
+    def setUp(self):
+        self.index = BoundingVolumeHierarchy.from_shape(
+            get_test_box_shape(), TopAbs_FACE, leaf_size=2
+        )
+
+    def test_query_point(self):
+        self.assertEqual(len(self.index), 6)
+        # the three faces that meet at the origin
+        ids = self.index.query_point(gp_Pnt(0, 0, 0))
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(len(self.index.query_point((5, 10, 15))), 0)
+
+    def test_query_box(self):
+        ids = self.index.query_box((-1, -1, -1, 1, 1, 40))
+        self.assertEqual(len(ids), 4)
+
+    def test_query_ray(self):
+        ids = self.index.query_ray(gp_Pnt(-5, 10, 15), gp_Dir(1, 0, 0))
+        self.assertEqual(len(ids), 2)
+        # the face at x = 0 is hit first
+        xmin, _, _, xmax, _, _ = get_boundingbox(self.index.shape_from_id(ids[0]))
+        self.assertAlmostEqual(xmin, 0.0, 4)
+        self.assertAlmostEqual(xmax, 0.0, 4)
+
+    def test_nearest(self):
+        nearest = self.index.nearest((5, 10, 40), k=2)
+        self.assertEqual(len(nearest), 2)
+        _, _, zmin, _, _, _ = get_boundingbox(self.index.shape_from_id(nearest[0]))
+        self.assertAlmostEqual(zmin, 30.0, 4)
+
+
+class TestIteration(unittest.TestCase):
+    def test_edge_pairs_from_wire(self):
+        square = [gp_Pnt(0, 0, 0), gp_Pnt(1, 0, 0), gp_Pnt(1, 1, 0), gp_Pnt(0, 1, 0)]
+        pairs = EdgePairsFromWire(make_polygon(square, closed=True))
+        self.assertEqual(len(pairs), 4)
+        # the pairs can be iterated over more than once
+        self.assertEqual(len(list(pairs)), len(list(pairs)))
+        for (edge_a, edge_b), (next_a, next_b) in zip(pairs, list(pairs)[1:]):
+            self.assertTrue(edge_b.IsSame(next_a))
+        corners = pairs.corners()
+        self.assertEqual(corners["vertex"].shape, (4, 3))
+        self.assertIn([1.0, 0.0, 0.0], corners["vertex"].tolist())
+        for angle in corners["angle"]:
+            self.assertAlmostEqual(angle, 1.5707963267948966)
+        self.assertFalse(corners["tangent_continuous"].any())
+        # the former step by step interface
+        self.assertEqual(pairs.next(), list(pairs[0]))
+        self.assertEqual(next(pairs), list(pairs[1]))
+
+    def test_loop_wire_pairs(self):
+        square = [(0, 0), (1, 0), (1, 1), (0, 1)]
+        wire_a = make_polygon([gp_Pnt(x, y, 0) for x, y in square], closed=True)
+        wire_b = make_polygon([gp_Pnt(x, y, 2) for x, y in square], closed=True)
+        n_pairs = 0
+        for edges_a, edges_b in LoopWirePairs(wire_a, wire_b):
+            # each edge of wire A is paired with the edge right above it
+            for edge_a, edge_b in zip(edges_a, edges_b):
+                distance = edge_a.mid_point().Distance(edge_b.mid_point())
+                self.assertAlmostEqual(distance, 2.0)
+            n_pairs += 1
+        self.assertEqual(n_pairs, 4)
+
 
 class TestEdge(unittest.TestCase):
     def test_creat_edge(self):
@@ -176,6 +836,21 @@ class TestEdge(unittest.TestCase):
         assert my_edge.type == 'line'
         assert my_edge.length() == 30.
 
+    def test_global_properties_after_edit(self):
+        edge = Edge(BRepBuilderAPI_MakeEdge(gp_Pnt(0, 0, 0), gp_Pnt(10, 0, 0)).Edge())
+        self.assertAlmostEqual(edge.GlobalProperties.bbox()[3], 10.0, places=4)
+        self.assertAlmostEqual(edge.GlobalProperties.centre().X(), 5.0)
+        # the curve of the edge is replaced in place, its TShape is the same
+        BRep_Builder().UpdateEdge(edge, Geom_Line(gp_Pnt(0, 0, 0), gp_Dir(0, 1, 0)),
+                                  1e-7)
+        edge.is_dirty = True
+        self.assertAlmostEqual(edge.GlobalProperties.bbox()[3], 0.0, places=4)
+        self.assertAlmostEqual(edge.GlobalProperties.bbox()[4], 10.0, places=4)
+        centre = edge.GlobalProperties.centre()
+        self.assertAlmostEqual(centre.X(), 0.0)
+        self.assertAlmostEqual(centre.Y(), 5.0)
+        self.assertAlmostEqual(edge.GlobalProperties.area(), 10.0)
+
 
 class TestFace(unittest.TestCase):
     def test_creat_face(self):